@@ -0,0 +1,277 @@
+import asyncio
+import json
+import math
+import re
+import statistics
+import time
+import urllib.request
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.error import HTTPError
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+SCENARIOS: dict[str, Callable] = {}
+
+USERS_FIXTURE = Path(__file__).parent / "fixtures" / "users.json"
+
+# Keys of result rows that are measurements. The remaining keys identify the row.
+METRICS = (
+    "mean_ms",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "requests_per_s",
+    "queries",
+    "errors",
+)
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def scenario(name: str):
+    """
+    Register a benchmark scenario for `manage.py benchmark`.
+
+    Scenarios live in a ``benchmarks`` module of an installed app, take the parsed
+    command options and return a list of result rows.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        SCENARIOS[name] = func
+        return func
+
+    return decorator
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def measure(func: Callable, iterations: int) -> dict:
+    """
+    Call ``func`` repeatedly and summarise its latency and query count.
+    """
+    timings = []
+    queries = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(context.captured_queries))
+
+    return {
+        "iterations": iterations,
+        **summarise(timings),
+        "queries": round(statistics.fmean(queries), 2),
+    }
+
+
+def summarise(timings: list[float]) -> dict:
+    return {
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+    }
+
+
+def measure_concurrent(func: Callable, iterations: int, concurrency: int) -> dict:
+    """
+    Call ``func`` from ``concurrency`` threads and summarise latency and throughput.
+    """
+
+    def timed(_) -> float:
+        start = time.perf_counter()
+        func()
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        timings = list(executor.map(timed, range(iterations)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "requests_per_s": round(iterations / elapsed, 1),
+        **summarise(timings),
+    }
+
+
+async def ameasure_concurrent(
+    func: Callable[[], Awaitable], iterations: int, concurrency: int
+) -> dict:
+    """
+    Await ``func`` with at most ``concurrency`` calls in flight and summarise
+    latency and throughput.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed() -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            await func()
+            return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    timings = await asyncio.gather(*(timed() for _ in range(iterations)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "requests_per_s": round(iterations / elapsed, 1),
+        **summarise(list(timings)),
+    }
+
+
+def measure_requests(
+    driver,
+    path: str,
+    iterations: int,
+    concurrency: int,
+    body: Callable[[], dict] | None = None,
+) -> dict:
+    """
+    Request ``path`` through ``driver`` from ``concurrency`` threads and
+    summarise latency, throughput and queries per request.
+
+    Sends GET requests, or POST requests of a fresh ``body()`` when given.
+    """
+    responses = []
+
+    def send() -> None:
+        if body is None:
+            responses.append(driver.get(path))
+        else:
+            responses.append(driver.post(path, body()))
+
+    stats = measure_concurrent(send, iterations, concurrency)
+    return {
+        **stats,
+        "queries": round(statistics.fmean(q for _, q in responses), 2),
+        "errors": sum(status >= 400 for status, _ in responses),
+    }
+
+
+def server_timing_queries(headers) -> int:
+    # Set by PerformanceMiddleware, so it is available over HTTP as well.
+    match = SERVER_TIMING_QUERIES.search(headers.get("Server-Timing", ""))
+    return int(match.group(1)) if match else 0
+
+
+class ClientDriver:
+    """
+    Sends requests through the in-process test client.
+    """
+
+    def __init__(self, token: str | None):
+        self.headers = {"Authorization": token} if token else {}
+
+    def get(self, path: str) -> tuple[int, int]:
+        response = Client(headers=self.headers).get(path)
+        return response.status_code, server_timing_queries(response.headers)
+
+    def post(self, path: str, data: dict) -> tuple[int, int]:
+        response = Client(headers=self.headers).post(
+            path, data, content_type="application/json"
+        )
+        return response.status_code, server_timing_queries(response.headers)
+
+
+class LiveServerDriver:
+    """
+    Sends requests over HTTP to the server at ``base_url``.
+    """
+
+    def __init__(self, base_url: str, token: str | None):
+        self.base_url = base_url
+        self.headers = {"Authorization": token} if token else {}
+
+    def get(self, path: str) -> tuple[int, int]:
+        return self.send(
+            urllib.request.Request(self.base_url + path, headers=self.headers)
+        )
+
+    def post(self, path: str, data: dict) -> tuple[int, int]:
+        return self.send(
+            urllib.request.Request(
+                self.base_url + path,
+                data=json.dumps(data).encode(),
+                headers={**self.headers, "Content-Type": "application/json"},
+            )
+        )
+
+    @staticmethod
+    def send(request: urllib.request.Request) -> tuple[int, int]:
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status, server_timing_queries(response.headers)
+        except HTTPError as e:
+            return e.code, server_timing_queries(e.headers)
+
+
+def get_driver(
+    options: dict, token: str | None = None
+) -> ClientDriver | LiveServerDriver:
+    if options.get("live_server_url"):
+        return LiveServerDriver(options["live_server_url"], token)
+    return ClientDriver(token)
+
+
+def create_users(count: int, prefix: str = "bench") -> list[User]:
+    """
+    Create ``count`` users modelled on the users of the ``users`` fixture.
+    """
+    seeds = [
+        entry["fields"]
+        for entry in json.loads(USERS_FIXTURE.read_text())
+        if entry["model"] == "auth.user"
+    ]
+    users = []
+    for i in range(count):
+        seed = seeds[i % len(seeds)]
+        fields = {**seed}
+        for name in ("username", "email", "first_name", "last_name"):
+            fields[name] = f"{prefix}{i}-{seed[name]}"
+        users.append(User(**fields))
+    return User.objects.bulk_create(users)
+
+
+def compare_results(baseline: dict, results: dict) -> Iterator[str]:
+    """
+    Describe how the measurements of ``results`` changed from ``baseline``.
+
+    Rows are matched by scenario and by the keys that are not measurements.
+    """
+    for name, rows in results.items():
+        previous = {row_key(row): row for row in baseline.get(name, [])}
+        for row in rows:
+            old = previous.get(row_key(row))
+            if old is None:
+                continue
+            changes = ", ".join(
+                describe_change(metric, old[metric], row[metric])
+                for metric in METRICS
+                if metric in row and metric in old
+            )
+            yield f"{name}: {row_key(row)} {changes}"
+
+
+def row_key(row: dict) -> str:
+    return json.dumps({k: v for k, v in row.items() if k not in METRICS})
+
+
+def describe_change(metric: str, old: float, new: float) -> str:
+    if not old:
+        return f"{metric} {old} -> {new}"
+    return f"{metric} {old} -> {new} ({(new - old) / old:+.0%})"
@@ -0,0 +1,27 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+
+
+def get_version(key: str) -> str:
+    """
+    Current cache version stored under ``key``, created on first use.
+
+    Versions are random tokens rather than counters, so a version recreated after
+    an eviction can never match entries cached under an earlier one.
+    """
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+async def aget_version(key: str) -> str:
+    version = await cache.aget(key)
+    if version is None:
+        version = uuid4().hex
+        await cache.aadd(key, version, timeout=None)
+        version = await cache.aget(key, version)
+    return version
@@ -0,0 +1,40 @@
+import hashlib
+from datetime import datetime
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts) -> str:
+    """
+    Quoted strong ETag derived from the ``repr`` of the given parts.
+    """
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+def with_validators(
+    response: HttpResponse, etag: str, last_modified: datetime | None = None
+) -> HttpResponse:
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def not_modified(
+    request: HttpRequest, etag: str, last_modified: datetime | None = None
+) -> HttpResponse | None:
+    """
+    ``304 Not Modified`` (or ``412``) response when the request's conditional
+    headers match the validators, otherwise ``None``.
+    """
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is None:
+        return None
+    return with_validators(response, etag, last_modified)
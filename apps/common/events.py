@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from contextlib import suppress
+from functools import cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+try:
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Wakes every stream, for changes that were not announced one by one.
+WAKE_ALL = {"task_ids": None, "user_ids": None}
+
+
+class Hub:
+    """
+    Fans messages out to the asyncio queues of the streams open in this process.
+
+    Messages may be dispatched from any thread. They only wake streams up, so a
+    full queue drops them: its stream has a wake-up pending already.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.queues: dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(self.queue_size)
+        with self.lock:
+            self.queues[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self.lock:
+            self.queues.pop(queue, None)
+
+    def dispatch(self, message: dict) -> None:
+        with self.lock:
+            queues = list(self.queues.items())
+        for queue, loop in queues:
+            try:
+                loop.call_soon_threadsafe(put_nowait, queue, message)
+            except RuntimeError:
+                # The loop of an abandoned stream is closed.
+                self.unsubscribe(queue)
+
+
+def put_nowait(queue: asyncio.Queue, message: dict) -> None:
+    with suppress(asyncio.QueueFull):
+        queue.put_nowait(message)
+
+
+class LocalBroker:
+    """
+    Delivers published messages to the streams of this process only.
+
+    Enough for a single process, and the stand-in for a shared broker in tests.
+    """
+
+    def __init__(self):
+        self.hub = Hub()
+
+    def publish(self, message: dict) -> None:
+        self.hub.dispatch(message)
+
+    def subscribe(self) -> asyncio.Queue:
+        return self.hub.subscribe()
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.hub.unsubscribe(queue)
+
+
+class RedisBroker(LocalBroker):
+    """
+    Relays published messages through a Redis channel to every process.
+
+    A daemon thread, started with the first subscription, passes the messages of
+    the channel on to the streams of this process. It reconnects when the
+    connection drops, waiting twice as long after every failed attempt, and
+    then wakes every stream, as messages published in between are lost.
+    Requires the redis package.
+    """
+
+    channel = "tms:events"
+    # Seconds before the first reconnection attempt, and at most between two.
+    retry_delay = 0.5
+    max_retry_delay = 30.0
+
+    def __init__(self):
+        if redis is None:
+            raise ImproperlyConfigured("RedisBroker requires the redis package.")
+        super().__init__()
+        self.client = redis.Redis.from_url(settings.EVENTS_REDIS_URL)
+        self.listener = None
+        self.lock = threading.Lock()
+
+    def publish(self, message: dict) -> None:
+        self.client.publish(self.channel, json.dumps(message))
+
+    def subscribe(self) -> asyncio.Queue:
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, daemon=True)
+                self.listener.start()
+        return super().subscribe()
+
+    def listen(self) -> None:
+        delay = None
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                if delay is not None:
+                    self.hub.dispatch(WAKE_ALL)
+                    delay = None
+                for message in pubsub.listen():
+                    self.hub.dispatch(json.loads(message["data"]))
+            except (redis.ConnectionError, redis.TimeoutError):
+                delay = min(
+                    self.max_retry_delay,
+                    self.retry_delay if delay is None else delay * 2,
+                )
+                logger.warning("Lost the events channel, reconnecting in %.1f s", delay)
+                time.sleep(delay)
+            finally:
+                pubsub.close()
+
+
+@cache
+def get_broker() -> LocalBroker:
+    # One broker per process, its hub holds the open streams.
+    return import_string(settings.EVENTS_BROKER)()
@@ -0,0 +1,47 @@
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+# Fields whose representation of a database value is the value itself.
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+)
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path of a serializer over ``.values()`` rows.
+
+    The field mapping is compiled once from the serializer's readable fields.
+    Identity fields are copied as they are and the rest go through the field's
+    own ``to_representation``, so the output equals the serializer's without a
+    model instance or a field lookup per row.
+    """
+
+    def __init__(self, serializer_class: type[serializers.Serializer]):
+        self.fields = []
+        for field in serializer_class()._readable_fields:
+            if "." in field.source or field.source == "*":
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{field.field_name} is not a "
+                    f"column and cannot be read from .values() rows."
+                )
+            convert = None if isinstance(field, IDENTITY_FIELDS) else field
+            self.fields.append((field.field_name, field.source, convert))
+        self.columns = tuple(dict.fromkeys(source for _, source, _ in self.fields))
+
+    def to_representation(self, rows) -> list[dict]:
+        return [
+            {
+                name: (
+                    row[source]
+                    if convert is None or row[source] is None
+                    else convert.to_representation(row[source])
+                )
+                for name, source, convert in self.fields
+            }
+            for row in rows
+        ]
@@ -0,0 +1,161 @@
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.testcases import LiveServerThread
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from apps.common.benchmark import SCENARIOS, compare_results
+
+
+class Command(BaseCommand):
+    help = "Run benchmark scenarios against a throwaway test database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenarios",
+            nargs="*",
+            help="Scenarios to run. Runs all registered scenarios when omitted.",
+        )
+        parser.add_argument(
+            "--sizes",
+            default="10,100,1000",
+            help="Comma separated dataset sizes each scenario is run with.",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Measured calls per scenario and size.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Requests in flight at once in concurrent scenarios.",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=20,
+            help="Users created from the users fixture by the API scenarios.",
+        )
+        parser.add_argument(
+            "--live-server",
+            action="store_true",
+            help="Send API requests over HTTP to a local server instead of "
+            "through the test client.",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--compare", help="Print the changes from the results in this JSON file."
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules("benchmarks")
+        names = options["scenarios"] or sorted(SCENARIOS)
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        options["sizes"] = [int(size) for size in options["sizes"].split(",")]
+
+        setup_test_environment()
+        # Throttling would answer the measured requests with 429s.
+        unthrottled = override_settings(
+            REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK,
+                "DEFAULT_THROTTLE_RATES": dict.fromkeys(
+                    settings.REST_FRAMEWORK.get("DEFAULT_THROTTLE_RATES", {})
+                ),
+            }
+        )
+        unthrottled.enable()
+        scratch = tempfile.TemporaryDirectory()
+        if (
+            connection.vendor == "sqlite"
+            and not connection.settings_dict["TEST"]["NAME"]
+        ):
+            # Concurrent writers fail on the shared in-memory test database with
+            # "database table is locked", a file behaves like the real database.
+            connection.settings_dict["TEST"]["NAME"] = str(
+                Path(scratch.name) / "benchmark.sqlite3"
+            )
+        old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+        server = self.start_live_server(options) if options["live_server"] else None
+        results = {}
+        try:
+            for name in names:
+                results[name] = SCENARIOS[name](options)
+                for row in results[name]:
+                    self.stdout.write(f"{name}: {json.dumps(row)}")
+        finally:
+            if server is not None:
+                server.terminate()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            unthrottled.disable()
+            scratch.cleanup()
+            teardown_test_environment()
+
+        if options["compare"]:
+            baseline = json.loads(Path(options["compare"]).read_text())
+            # Files written before the run metadata was added hold only results.
+            baseline = baseline.get("results", baseline)
+            for line in compare_results(baseline, results):
+                self.stdout.write(line)
+
+        if options["output"]:
+            run = {
+                "commit": self.current_commit(),
+                "created_at": timezone.now().isoformat(),
+                "options": {
+                    name: options[name]
+                    for name in (
+                        "sizes",
+                        "iterations",
+                        "concurrency",
+                        "users",
+                        "live_server",
+                    )
+                },
+                "results": results,
+            }
+            Path(options["output"]).write_text(json.dumps(run, indent=2))
+
+    @staticmethod
+    def start_live_server(options: dict) -> LiveServerThread:
+        """
+        Serve the test database over HTTP from a thread of this process.
+        """
+        # Restored by teardown_test_environment().
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "localhost"]
+        server = LiveServerThread("localhost", lambda handler: handler)
+        server.daemon = True
+        server.start()
+        server.is_ready.wait()
+        if server.error:
+            raise server.error
+        options["live_server_url"] = f"http://localhost:{server.port}"
+        return server
+
+    @staticmethod
+    def current_commit() -> str | None:
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+            )
+        except OSError:
+            return None
+        return result.stdout.strip() or None
@@ -0,0 +1,74 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+
+TABLE = "stress_db_writes"
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer the database with concurrent read-then-write transactions from "
+        "several threads and report throughput and lock errors. Uses a scratch "
+        "table that is dropped afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument(
+            "--writes", type=int, default=200, help="Transactions per worker."
+        )
+
+    def handle(self, *args, **options):
+        database = options["database"]
+        workers = options["workers"]
+        writes = options["writes"]
+
+        with connections[database].cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            cursor.execute(
+                f"CREATE TABLE {TABLE} (id bigint PRIMARY KEY, worker integer NOT NULL)"
+            )
+
+        errors = []
+
+        def work(worker: int) -> None:
+            try:
+                for i in range(writes):
+                    with (
+                        transaction.atomic(using=database),
+                        connections[database].cursor() as cursor,
+                    ):
+                        cursor.execute(
+                            f"SELECT COUNT(*) FROM {TABLE} WHERE worker = %s", [worker]
+                        )
+                        cursor.execute(
+                            f"INSERT INTO {TABLE} (id, worker) VALUES (%s, %s)",
+                            [worker * writes + i, worker],
+                        )
+            except DatabaseError as e:
+                errors.append(e)
+            finally:
+                connections[database].close()
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        with connections[database].cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {TABLE}")
+            (written,) = cursor.fetchone()
+            cursor.execute(f"DROP TABLE {TABLE}")
+
+        self.stdout.write(
+            f"{written} writes from {workers} workers in {elapsed:.2f}s "
+            f"({written / elapsed:.0f} writes/s), {len(errors)} failed workers"
+        )
+        if errors:
+            raise CommandError(f"Concurrent writes failed: {errors[0]}")
@@ -0,0 +1,126 @@
+import copy
+import threading
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+
+# Upper bounds, in seconds, of the request duration histogram buckets.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class RouteStats:
+    buckets: list[int]
+    count: int = 0
+    seconds: float = 0.0
+    queries: int = 0
+    db_seconds: float = 0.0
+    statuses: Counter = field(default_factory=Counter)
+
+
+class RequestMetrics:
+    """
+    Per-route request metrics of this process, rendered in the Prometheus text
+    format.
+
+    Counters only ever grow, Prometheus derives rates and windowed percentiles
+    from them with ``rate()`` and ``histogram_quantile()``. Routes are URL
+    patterns, not paths, so the number of series stays bounded.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self.routes: dict[tuple[str, str], RouteStats] = {}
+        self.lock = threading.Lock()
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        queries: int,
+        db_seconds: float,
+    ) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self.lock:
+            stats = self.routes.get((method, route))
+            if stats is None:
+                stats = self.routes[method, route] = RouteStats(
+                    [0] * (len(self.buckets) + 1)
+                )
+            stats.buckets[index] += 1
+            stats.count += 1
+            stats.seconds += seconds
+            stats.queries += queries
+            stats.db_seconds += db_seconds
+            stats.statuses[status] += 1
+
+    def reset(self) -> None:
+        with self.lock:
+            self.routes.clear()
+
+    def render(self) -> str:
+        with self.lock:
+            routes = sorted(copy.deepcopy(self.routes).items())
+
+        lines = [
+            "# HELP http_requests_total Requests served.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route), stats in routes:
+            for status, count in sorted(stats.statuses.items()):
+                labels = format_labels(method=method, route=route, status=status)
+                lines.append(f"http_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds Request wall time.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), stats in routes:
+            cumulative = 0
+            for bound, count in zip(
+                (*self.buckets, "+Inf"), stats.buckets, strict=True
+            ):
+                cumulative += count
+                labels = format_labels(method=method, route=route, le=bound)
+                lines.append(
+                    f"http_request_duration_seconds_bucket{{{labels}}} {cumulative}"
+                )
+            labels = format_labels(method=method, route=route)
+            lines.append(
+                f"http_request_duration_seconds_sum{{{labels}}} {stats.seconds}"
+            )
+            lines.append(
+                f"http_request_duration_seconds_count{{{labels}}} {stats.count}"
+            )
+
+        lines += [
+            "# HELP http_request_db_queries_total Database queries run by requests.",
+            "# TYPE http_request_db_queries_total counter",
+        ]
+        for (method, route), stats in routes:
+            labels = format_labels(method=method, route=route)
+            lines.append(f"http_request_db_queries_total{{{labels}}} {stats.queries}")
+
+        lines += [
+            "# HELP http_request_db_duration_seconds_total Time requests spent in "
+            "database queries.",
+            "# TYPE http_request_db_duration_seconds_total counter",
+        ]
+        for (method, route), stats in routes:
+            labels = format_labels(method=method, route=route)
+            lines.append(
+                f"http_request_db_duration_seconds_total{{{labels}}} {stats.db_seconds}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+REQUEST_METRICS = RequestMetrics()
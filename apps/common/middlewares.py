@@ -1,12 +1,20 @@
 import logging
+import time
 import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
 from django.http import JsonResponse
 from django.utils import translation
 from django.utils.deprecation import MiddlewareMixin
 from django.utils.translation import gettext as _
 
+from apps.common.metrics import REQUEST_METRICS
+
 logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("apps.common.slow_queries")
 
 
 # Create your middleware here.
@@ -28,3 +36,102 @@ class ApiMiddleware(MiddlewareMixin):
             },
             status=500,
         )
+
+
+class QueryTimer:
+    """
+    Counts and times the queries of one request, and logs those slower than
+    ``SLOW_QUERY_THRESHOLD_MS``.
+
+    ``time_query`` is an ``execute_wrapper`` on every connection, and reports to
+    the timer installed in the current context. Under ASGI the ORM runs in
+    ``sync_to_async`` worker threads, which have their own connections but copy
+    the context of the request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.seconds += elapsed
+            if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+                slow_query_logger.warning(
+                    "Slow query (%.1f ms): %s", elapsed * 1000, sql
+                )
+
+    @contextmanager
+    def installed(self):
+        token = current_query_timer.set(self)
+        try:
+            yield self
+        finally:
+            current_query_timer.reset(token)
+
+
+current_query_timer: ContextVar[QueryTimer | None] = ContextVar(
+    "current_query_timer", default=None
+)
+
+
+def time_query(execute, sql, params, many, context):
+    timer = current_query_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+class PerformanceMiddleware:
+    """
+    Records wall time, query count and query time of every request.
+
+    The numbers are added to the response as a ``Server-Timing`` header and to
+    the per-route metrics served by ``MetricsView``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with QueryTimer().installed() as timer:
+            response = self.get_response(request)
+        return self.finish(request, response, start, timer)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with QueryTimer().installed() as timer:
+            response = await self.get_response(request)
+        return self.finish(request, response, start, timer)
+
+    @staticmethod
+    def finish(request, response, start: float, timer: QueryTimer):
+        elapsed = time.perf_counter() - start
+        match = request.resolver_match
+        REQUEST_METRICS.observe(
+            request.method,
+            match.route if match else "unmatched",
+            response.status_code,
+            elapsed,
+            timer.count,
+            timer.seconds,
+        )
+        response["Server-Timing"] = (
+            f"app;dur={elapsed * 1000:.1f}, "
+            f'db;dur={timer.seconds * 1000:.1f};desc="{timer.count} queries"'
+        )
+        return response
@@ -0,0 +1,192 @@
+from collections.abc import Sequence
+from itertools import chain
+
+from django.db.models import QuerySet
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the primary key.
+
+    Every page is fetched with ``WHERE id > <cursor> LIMIT <size>``, so deep pages
+    cost the same as the first one. The cursor is opaque to clients.
+    """
+
+    ordering = "id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_querysets(
+        self, querysets: Sequence[QuerySet], request, view=None
+    ) -> list:
+        """
+        ``paginate_queryset`` over the rows of several querysets whose ids never
+        overlap, like a table and its archive.
+
+        Each queryset is read up to the end of the page and the rows are merged
+        by id, so a page costs one keyset query per queryset.
+        """
+        offset, reverse, position = self.start_page(request, querysets[0], view)
+        rows = [list(self.page_window(q, offset, reverse, position)) for q in querysets]
+        return self.end_page(
+            self.merge(rows, offset, reverse), reverse, position, offset
+        )
+
+    async def apaginate_queryset(self, queryset, request, view=None) -> list:
+        """
+        Async counterpart of ``paginate_queryset`` for async views.
+
+        Positions come from the unique primary key, so unlike the generic cursor
+        logic there is never a tie to skip over.
+        """
+        return await self.apaginate_querysets([queryset], request, view)
+
+    async def apaginate_querysets(
+        self, querysets: Sequence[QuerySet], request, view=None
+    ) -> list:
+        offset, reverse, position = self.start_page(request, querysets[0], view)
+        rows = [
+            [item async for item in self.page_window(q, offset, reverse, position)]
+            for q in querysets
+        ]
+        return self.end_page(
+            self.merge(rows, offset, reverse), reverse, position, offset
+        )
+
+    def start_page(self, request, queryset, view) -> tuple[int, bool, int | None]:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        return self.cursor or (0, False, None)
+
+    def page_window(
+        self, queryset: QuerySet, offset: int, reverse: bool, position: int | None
+    ) -> QuerySet:
+        # Every row up to one past the page, so that the next page is detected.
+        queryset = queryset.order_by("-id" if reverse else "id")
+        if position is not None:
+            queryset = queryset.filter(**{"id__lt" if reverse else "id__gt": position})
+        return queryset[: offset + self.page_size + 1]
+
+    def merge(self, rows: list[list], offset: int, reverse: bool) -> list:
+        if len(rows) == 1:
+            merged = rows[0]
+        else:
+            merged = sorted(
+                chain.from_iterable(rows),
+                # DRF positions are strings, which would sort 10 before 2.
+                key=lambda item: item["id"] if isinstance(item, dict) else item.id,
+                reverse=reverse,
+            )
+        return merged[offset : offset + self.page_size + 1]
+
+    def end_page(
+        self, results: list, reverse: bool, position: int | None, offset: int
+    ) -> list:
+        self.page = results[: self.page_size]
+        following = (
+            self._get_position_from_instance(results[-1], self.ordering)
+            if len(results) > len(self.page)
+            else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None or offset > 0
+            self.has_previous = following is not None
+            self.next_position, self.previous_position = position, following
+        else:
+            self.has_next = following is not None
+            self.has_previous = position is not None or offset > 0
+            self.next_position, self.previous_position = following, position
+        return self.page
+
+    def get_paginated_data(self, data) -> dict:
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+
+class RankedPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination for relevance ordered results.
+
+    Fetches one row past the page to detect a next page instead of counting every
+    match. Unlike the other lists, ranked results cannot be paged by keyset: the
+    rank is computed per query, so there is no indexed position to seek to, and a
+    page costs its offset in skipped rows. Offsets are therefore capped at
+    ``max_offset``; clients wanting more should refine the query.
+    """
+
+    default_limit = 50
+    max_limit = 500
+    max_offset = 1000
+
+    def get_offset(self, request) -> int:
+        offset = super().get_offset(request)
+        if offset > self.max_offset:
+            raise ValidationError(
+                {
+                    self.offset_query_param: [
+                        f"Ensure this value is less than or equal to "
+                        f"{self.max_offset}."
+                    ]
+                }
+            )
+        return offset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        return self.end_page(list(self.page_window(queryset)))
+
+    async def apaginate_queryset(self, queryset, request, view=None) -> list:
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        return self.end_page([row async for row in self.page_window(queryset)])
+
+    def page_window(self, queryset):
+        return queryset[self.offset : self.offset + self.limit + 1]
+
+    def end_page(self, rows: list) -> list:
+        # No next link past the offset cap, it would only lead to an error.
+        self.has_next = (
+            len(rows) > self.limit and self.offset + self.limit <= self.max_offset
+        )
+        return rows[: self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_paginated_data(self, data) -> dict:
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"].pop("count")
+        response_schema["required"].remove("count")
+        return response_schema
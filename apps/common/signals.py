@@ -0,0 +1,12 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from apps.common.middlewares import time_query
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs) -> None:
+    # Sent again when a connection reconnects. First in the list, so that the
+    # last-in, first-out connection.execute_wrapper() contexts stay balanced.
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_query)
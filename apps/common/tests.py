@@ -1,13 +1,26 @@
 import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
 
-from django.contrib.auth.models import User
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
 from django.http import JsonResponse
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
 from django.urls import path
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
+from apps.common.events import WAKE_ALL, RedisBroker
+from apps.common.metrics import REQUEST_METRICS
 from apps.common.middlewares import ApiMiddleware
+from apps.common.throttling import TokenBucketThrottle
 
 
 class TestCommon(TestCase):
@@ -38,6 +51,83 @@ urlpatterns = [
 ]
 
 
+class PerformanceMiddlewareTestCase(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        REQUEST_METRICS.reset()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.get(email="user1@email.com"))
+
+    def test_server_timing_header(self) -> None:
+        response = self.client.get(reverse("tasks"))
+
+        self.assertEqual(response.status_code, 200)
+        app, db = response["Server-Timing"].split(", ")
+        self.assertRegex(app, r"^app;dur=\d+\.\d$")
+        self.assertRegex(db, r'^db;dur=\d+\.\d;desc="[1-9]\d* queries"$')
+
+    def test_metrics_are_recorded_per_route(self) -> None:
+        for _ in range(3):
+            self.client.get(reverse("tasks"))
+        self.client.get("/does-not-exist")
+
+        response = self.client.get(reverse("metrics_view"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4")
+        body = response.content.decode()
+        self.assertIn(
+            'http_requests_total{method="GET",route="tasks",status="200"} 3', body
+        )
+        self.assertIn(
+            'http_request_duration_seconds_bucket{method="GET",route="tasks",'
+            'le="+Inf"} 3',
+            body,
+        )
+        self.assertIn(
+            'http_request_duration_seconds_count{method="GET",route="tasks"} 3', body
+        )
+        self.assertIn('route="unmatched",status="404"', body)
+        self.assertRegex(
+            body, r'http_request_db_queries_total\{method="GET",route="tasks"\} [1-9]'
+        )
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_are_logged(self) -> None:
+        with self.assertLogs("apps.common.slow_queries", "WARNING") as logs:
+            self.client.get(reverse("tasks"))
+
+        self.assertIn("task_task", "\n".join(logs.output))
+
+    @override_settings(ROOT_URLCONF="config.urls_asgi")
+    async def test_async_request_queries_are_counted(self) -> None:
+        # The ORM runs in sync_to_async's executor, not the event loop thread.
+        user = await User.objects.aget(email="user1@email.com")
+        response = await self.async_client.get(
+            reverse("tasks"), AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(
+            response["Server-Timing"], r'db;dur=\d+\.\d;desc="[1-9]\d* queries"$'
+        )
+        self.assertRegex(
+            REQUEST_METRICS.render(),
+            r'http_request_db_queries_total\{method="GET",route="tasks"\} [1-9]',
+        )
+
+    async def test_async_requests_are_recorded(self) -> None:
+        response = await self.async_client.get(reverse("health_view"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Server-Timing", response)
+        self.assertIn(
+            'http_requests_total{method="GET",route="common/health",status="200"} 1',
+            REQUEST_METRICS.render(),
+        )
+
+
 class ApiMiddlewareExceptionTestCase(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
@@ -68,3 +158,190 @@ class ApiMiddlewareExceptionTestCase(TestCase):
         self.assertEqual(
             content["detail"], "Something Went Wrong. Please contact support"
         )
+
+
+class ConcurrentWritesTestCase(SimpleTestCase):
+    """
+    Runs the write stress command in a separate process against a file based
+    SQLite database, configured from the environment like a deployment would be.
+    """
+
+    def test_concurrent_writers_do_not_lock_each_other_out(self):
+        with tempfile.TemporaryDirectory() as directory:
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "manage.py",
+                    "stress_db_writes",
+                    "--workers",
+                    "8",
+                    "--writes",
+                    "50",
+                ],
+                cwd=settings.BASE_DIR,
+                env={**os.environ, "DB_NAME": str(Path(directory) / "stress.sqlite3")},
+                capture_output=True,
+                text=True,
+            )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("400 writes from 8 workers", result.stdout)
+        self.assertIn("0 failed workers", result.stdout)
+
+
+class BenchmarkCommandTestCase(SimpleTestCase):
+    """
+    Runs the API benchmark in a separate process, which creates its own test
+    database.
+    """
+
+    def benchmark(self, *args: str) -> str:
+        result = subprocess.run(
+            [
+                sys.executable,
+                "manage.py",
+                "benchmark",
+                "api",
+                "--sizes",
+                "20",
+                "--iterations",
+                "4",
+                "--users",
+                "3",
+                *args,
+            ],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stdout
+
+    def test_results_are_saved_and_compared(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "results.json"
+            self.benchmark("--output", str(output))
+            run = json.loads(output.read_text())
+            stdout = self.benchmark("--live-server", "--compare", str(output))
+
+        rows = run["results"]["api"]
+        self.assertEqual(run["options"]["sizes"], [20])
+        self.assertEqual(
+            {row["endpoint"] for row in rows},
+            {
+                "tasks",
+                "tasks_by_user",
+                "task",
+                "comments",
+                "search",
+                "stats",
+                "users",
+                "users_search",
+            },
+        )
+        for row in rows:
+            self.assertEqual(row["errors"], 0)
+            self.assertGreater(row["queries"], 0)
+            self.assertGreater(row["requests_per_s"], 0)
+            self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+        self.assertIn('api: {"tasks": 20, "endpoint": "search"', stdout)
+        self.assertIn("p95_ms", stdout.splitlines()[-1])
+
+
+@override_settings(REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": {"test": "3/min"}})
+class TokenBucketThrottleTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.now = 1000.0
+        timer = patch.object(TokenBucketThrottle, "timer", lambda _: self.now)
+        timer.start()
+        self.addCleanup(timer.stop)
+        self.view = SimpleNamespace(throttle_scope="test")
+
+    def allow(self, user=None, addr: str = "10.0.0.1") -> tuple[bool, float | None]:
+        request = RequestFactory().get("/", REMOTE_ADDR=addr)
+        request.user = user or AnonymousUser()
+        throttle = TokenBucketThrottle()
+        return throttle.allow_request(request, self.view), throttle.wait()
+
+    def test_bucket_allows_a_burst_then_refills_at_the_rate(self) -> None:
+        self.assertEqual([self.allow() for _ in range(3)], [(True, None)] * 3)
+        self.assertEqual(self.allow(), (False, 20.0))
+
+        # One token comes back every 20 seconds.
+        self.now += 15
+        self.assertEqual(self.allow(), (False, 5.0))
+        self.now += 5
+        self.assertEqual(self.allow(), (True, None))
+        self.assertFalse(self.allow()[0])
+
+    def test_buckets_are_per_client_and_scope(self) -> None:
+        for _ in range(3):
+            self.allow()
+
+        self.assertFalse(self.allow()[0])
+        self.assertTrue(self.allow(addr="10.0.0.2")[0])
+        self.assertTrue(self.allow(user=User(pk=1))[0])
+        self.view = SimpleNamespace(throttle_scope=None)
+        self.assertTrue(self.allow()[0])
+
+    @override_settings(REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": {"test": None}})
+    def test_scope_without_rate_is_not_throttled(self) -> None:
+        self.assertEqual([self.allow()[0] for _ in range(10)], [True] * 10)
+
+
+class RedisBrokerTestCase(SimpleTestCase):
+    class StoppedError(Exception):
+        pass
+
+    def setUp(self) -> None:
+        # Every connection fails to subscribe, or delivers its messages and then
+        # fails with its error.
+        self.connections = [
+            (ConnectionError, [], None),
+            (ConnectionError, [], None),
+            (None, [{"task_ids": [1]}], ConnectionError),
+            (None, [{"task_ids": [2]}], self.StoppedError),
+        ]
+        client = SimpleNamespace(pubsub=lambda **kwargs: self.pubsub())
+        fake_redis = SimpleNamespace(
+            Redis=SimpleNamespace(from_url=lambda url: client),
+            ConnectionError=ConnectionError,
+            TimeoutError=TimeoutError,
+        )
+        patch("apps.common.events.redis", fake_redis).start()
+        self.sleep = patch("apps.common.events.time.sleep").start()
+        self.addCleanup(patch.stopall)
+
+    def pubsub(self) -> SimpleNamespace:
+        subscribe_error, messages, error = self.connections.pop(0)
+
+        def subscribe(channel):
+            if subscribe_error:
+                raise subscribe_error
+
+        def listen():
+            for message in messages:
+                yield {"data": json.dumps(message).encode()}
+            raise error
+
+        return SimpleNamespace(subscribe=subscribe, listen=listen, close=lambda: None)
+
+    def test_listener_reconnects_with_backoff(self) -> None:
+        broker = RedisBroker()
+        dispatched = []
+        broker.hub = SimpleNamespace(dispatch=dispatched.append)
+
+        with (
+            self.assertLogs("apps.common.events", "WARNING"),
+            self.assertRaises(self.StoppedError),
+        ):
+            broker.listen()
+
+        self.assertEqual(
+            [call.args[0] for call in self.sleep.call_args_list], [0.5, 1.0, 0.5]
+        )
+        # Messages published while disconnected are lost, so streams re-read.
+        self.assertEqual(
+            dispatched, [WAKE_ALL, {"task_ids": [1]}, WAKE_ALL, {"task_ids": [2]}]
+        )
@@ -0,0 +1,93 @@
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    # DRF's "<requests>/<period>" format, e.g. "30/min".
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per user, or client address for anonymous requests, and per
+    ``throttle_scope`` of the view.
+
+    A ``"<n>/<period>"`` rate in ``DEFAULT_THROTTLE_RATES`` gives a bucket of n
+    tokens refilled at n per period, so a client can burst n requests and then
+    keep to the rate. The bucket is one cache entry, read and written once per
+    request. Concurrent requests of one client may both take its last token, as
+    the two steps are not atomic.
+
+    Views without a ``throttle_scope``, and scopes rated ``None``, are not
+    throttled.
+    """
+
+    timer = time.time
+
+    def __init__(self):
+        self.retry_after = None
+
+    def allow_request(self, request, view) -> bool:
+        rate = self.get_rate(view)
+        if rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        tokens = self.take(cache.get(key), *rate)
+        cache.set(key, tokens, rate[1])
+        return self.retry_after is None
+
+    async def aallow_request(self, request, view) -> bool:
+        rate = self.get_rate(view)
+        if rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        tokens = self.take(await cache.aget(key), *rate)
+        await cache.aset(key, tokens, rate[1])
+        return self.retry_after is None
+
+    def wait(self) -> float | None:
+        return self.retry_after
+
+    @staticmethod
+    def get_rate(view) -> tuple[int, int] | None:
+        scope = getattr(view, "throttle_scope", None)
+        if scope is None:
+            return None
+        try:
+            rate = api_settings.DEFAULT_THROTTLE_RATES[scope]
+        except KeyError as e:
+            raise ImproperlyConfigured(
+                f"No throttle rate set for scope {scope!r}."
+            ) from e
+        return None if rate is None else parse_rate(rate)
+
+    def get_cache_key(self, request, view) -> str:
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"addr:{self.get_ident(request)}"
+        return f"throttle:{view.throttle_scope}:{ident}"
+
+    def take(
+        self, bucket: tuple[float, float] | None, capacity: int, period: int
+    ) -> tuple[float, float]:
+        """
+        Refill ``bucket``, a ``(tokens, timestamp)`` pair, and take one token
+        from it. Sets ``retry_after`` to the seconds until a token is available
+        when the bucket is empty.
+        """
+        now = self.timer()
+        tokens, filled_at = bucket or (capacity, now)
+        tokens = min(capacity, tokens + (now - filled_at) * capacity / period)
+        if tokens >= 1:
+            self.retry_after = None
+            return tokens - 1, now
+        self.retry_after = (1 - tokens) * period / capacity
+        return tokens, now
@@ -1,8 +1,9 @@
 from django.urls import path
 
-from apps.common.views import HealthView, ProtectedTestView
+from apps.common.views import HealthView, MetricsView, ProtectedTestView
 
 urlpatterns = [
     path("health", HealthView.as_view(), name="health_view"),
+    path("metrics", MetricsView.as_view(), name="metrics_view"),
     path("protected", ProtectedTestView.as_view(), name="protected_view"),
 ]
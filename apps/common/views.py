@@ -1,9 +1,11 @@
+from django.http import HttpResponse
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import AllowAny
 from rest_framework.request import Request
 from rest_framework.response import Response
 
 from apps.common.helpers import EmptySerializer
+from apps.common.metrics import REQUEST_METRICS
 
 
 class HealthView(GenericAPIView):
@@ -16,6 +18,18 @@ class HealthView(GenericAPIView):
         return Response({"live": True})
 
 
+class MetricsView(GenericAPIView):
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    serializer_class = EmptySerializer
+
+    @staticmethod
+    def get(request: Request) -> HttpResponse:
+        return HttpResponse(
+            REQUEST_METRICS.render(), content_type="text/plain; version=0.0.4"
+        )
+
+
 class ProtectedTestView(GenericAPIView):
     serializer_class = EmptySerializer
 
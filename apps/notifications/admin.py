@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from apps.notifications.models import Notification
+
+
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("subject", "recipient", "status", "attempts", "next_attempt_at")
+    list_filter = ("status",)
+    search_fields = ("recipient", "subject")
+
+
+admin.site.register(Notification, NotificationAdmin)
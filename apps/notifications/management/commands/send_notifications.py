@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.notifications.outbox import send_pending_notifications
+
+
+class Command(BaseCommand):
+    help = "Drain the notification outbox, sending due emails in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.NOTIFICATIONS_BATCH_SIZE,
+            help="Number of notifications sent per SMTP connection.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when the outbox has nothing due.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as the outbox has nothing due instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = send_pending_notifications(options["batch_size"])
+            if result["sent"] or result["failed"]:
+                self.stdout.write(
+                    f"Sent {result['sent']} notification(s), {result['failed']} failed"
+                )
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,130 @@
+import logging
+from collections.abc import Iterable
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.notifications.models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_notification(subject: str, message: str, recipient: str) -> Notification:
+    """
+    Store an outgoing email in the outbox instead of sending it inline.
+
+    Call it inside the transaction that performs the change being notified about,
+    so the notification is committed (or rolled back) together with it.
+    """
+    return Notification.objects.create(
+        subject=subject, message=message, recipient=recipient
+    )
+
+
+def enqueue_notifications(subject: str, message: str, recipients: Iterable[str]) -> int:
+    """
+    Fan the same email out to many recipients with chunked bulk inserts.
+    """
+    return enqueue_personal_notifications(
+        subject, {recipient: message for recipient in recipients}
+    )
+
+
+def enqueue_personal_notifications(subject: str, messages: dict[str, str]) -> int:
+    """
+    Queue one email per recipient, with the body taken from ``messages`` which is
+    keyed by recipient address.
+    """
+    notifications = [
+        Notification(subject=subject, message=message, recipient=recipient)
+        for recipient, message in messages.items()
+    ]
+    Notification.objects.bulk_create(
+        notifications, batch_size=settings.NOTIFICATIONS_FANOUT_CHUNK_SIZE
+    )
+    return len(notifications)
+
+
+def claim_notifications(batch_size: int) -> list[Notification]:
+    """
+    Pick the next due notifications and lease them to the current worker.
+
+    The lease pushes ``next_attempt_at`` forward so concurrent workers skip the
+    batch, and a worker that dies mid-batch only delays delivery until it expires.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status=Notification.Status.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        Notification.objects.filter(pk__in=[n.pk for n in batch]).update(
+            next_attempt_at=now + timedelta(seconds=settings.NOTIFICATIONS_LEASE)
+        )
+    return batch
+
+
+def record_failure(notification: Notification, error: Exception) -> None:
+    notification.attempts += 1
+    notification.last_error = str(error)
+    if notification.attempts >= settings.NOTIFICATIONS_MAX_ATTEMPTS:
+        notification.status = Notification.Status.FAILED
+    else:
+        backoff = settings.NOTIFICATIONS_RETRY_BACKOFF * 2 ** (
+            notification.attempts - 1
+        )
+        notification.next_attempt_at = timezone.now() + timedelta(seconds=backoff)
+    notification.save(
+        update_fields=["attempts", "last_error", "status", "next_attempt_at"]
+    )
+
+
+def send_pending_notifications(batch_size: int | None = None) -> dict[str, int]:
+    """
+    Deliver one batch of due notifications over a single SMTP connection.
+    """
+    batch = claim_notifications(batch_size or settings.NOTIFICATIONS_BATCH_SIZE)
+    if not batch:
+        return {"sent": 0, "failed": 0}
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Could not open mail connection: %s", e)
+        for notification in batch:
+            record_failure(notification, e)
+        return {"sent": 0, "failed": len(batch)}
+
+    sent_ids = []
+    failed = 0
+    try:
+        for notification in batch:
+            try:
+                EmailMessage(
+                    subject=notification.subject,
+                    body=notification.message,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[notification.recipient],
+                    connection=connection,
+                ).send()
+            except Exception as e:  # noqa: BLE001
+                logger.warning("Notification %s failed: %s", notification.pk, e)
+                record_failure(notification, e)
+                failed += 1
+            else:
+                sent_ids.append(notification.pk)
+    finally:
+        connection.close()
+
+    Notification.objects.filter(pk__in=sent_ids).update(
+        status=Notification.Status.SENT,
+        sent_at=timezone.now(),
+        attempts=F("attempts") + 1,
+    )
+    return {"sent": len(sent_ids), "failed": failed}
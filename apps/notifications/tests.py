@@ -0,0 +1,118 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.notifications.models import Notification
+from apps.notifications.outbox import enqueue_notification, send_pending_notifications
+
+
+class FlakyEmailBackend(EmailBackend):
+    """
+    Locmem backend that fails the next ``failures`` sends and counts connections.
+    """
+
+    failures = 0
+    opened = 0
+
+    def open(self):
+        FlakyEmailBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if FlakyEmailBackend.failures:
+            FlakyEmailBackend.failures -= 1
+            raise SMTPException("Mail server unavailable")
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND="apps.notifications.tests.FlakyEmailBackend",
+    NOTIFICATIONS_MAX_ATTEMPTS=3,
+    NOTIFICATIONS_RETRY_BACKOFF=30,
+)
+class TestOutbox(TestCase):
+    def setUp(self) -> None:
+        FlakyEmailBackend.failures = 0
+        FlakyEmailBackend.opened = 0
+
+    def test_enqueue_does_not_send(self) -> None:
+        enqueue_notification("Subject", "Body", "user1@email.com")
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            Notification.objects.filter(status=Notification.Status.PENDING).count(), 1
+        )
+
+    def test_batch_is_sent_over_one_connection(self) -> None:
+        for i in range(5):
+            enqueue_notification("Subject", f"Body {i}", f"user{i}@email.com")
+
+        result = send_pending_notifications(batch_size=10)
+
+        self.assertEqual(result, {"sent": 5, "failed": 0})
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(FlakyEmailBackend.opened, 1)
+        self.assertFalse(
+            Notification.objects.exclude(status=Notification.Status.SENT).exists()
+        )
+
+    def test_failed_send_is_retried_with_backoff(self) -> None:
+        notification = enqueue_notification("Subject", "Body", "user1@email.com")
+        FlakyEmailBackend.failures = 1
+
+        result = send_pending_notifications()
+
+        self.assertEqual(result, {"sent": 0, "failed": 1})
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, Notification.Status.PENDING)
+        self.assertEqual(notification.attempts, 1)
+        self.assertGreater(notification.next_attempt_at, timezone.now())
+
+        # Not due yet, so the next run leaves it alone.
+        self.assertEqual(send_pending_notifications(), {"sent": 0, "failed": 0})
+
+        Notification.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_pending_notifications(), {"sent": 1, "failed": 0})
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, Notification.Status.SENT)
+        self.assertEqual(notification.attempts, 2)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_gives_up_after_max_attempts(self) -> None:
+        notification = enqueue_notification("Subject", "Body", "user1@email.com")
+        FlakyEmailBackend.failures = 3
+
+        for _ in range(3):
+            Notification.objects.update(next_attempt_at=timezone.now())
+            send_pending_notifications()
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, Notification.Status.FAILED)
+        self.assertEqual(notification.attempts, 3)
+        self.assertEqual(notification.last_error, "Mail server unavailable")
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_leased_notifications_are_skipped(self) -> None:
+        enqueue_notification("Subject", "Body", "user1@email.com")
+        Notification.objects.update(
+            next_attempt_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        self.assertEqual(send_pending_notifications(), {"sent": 0, "failed": 0})
+
+    def test_command_drains_outbox(self) -> None:
+        for i in range(3):
+            enqueue_notification("Subject", f"Body {i}", f"user{i}@email.com")
+
+        call_command(
+            "send_notifications", "--once", "--batch-size", "2", stdout=StringIO()
+        )
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(FlakyEmailBackend.opened, 2)
@@ -0,0 +1,64 @@
+from collections.abc import Iterable
+
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.task.cache import invalidate_tasks
+from apps.task.changes import record_changes
+from apps.task.models import Comment, Task
+
+
+def record_comment(comment: Comment) -> None:
+    """
+    Bump the denormalized comment activity of the comment's task.
+
+    A single ``UPDATE`` with an ``F()`` increment, so concurrent comments never
+    lose a count.
+    """
+    Task.objects.filter(pk=comment.task_id).update(
+        comment_count=F("comment_count") + 1,
+        last_commented_at=comment.updated_at,
+        updated_at=timezone.now(),
+    )
+    # The comment views load the task, with its user, already.
+    users = [comment.task.user_id] if Comment.task.is_cached(comment) else None
+    record_changes([comment.task_id], users)
+
+
+def refresh_comment_activity(task_ids: Iterable[int], touch: bool = True) -> int:
+    """
+    Recompute ``comment_count`` and ``last_commented_at`` of the given tasks from
+    their comments, and return the number of tasks whose activity was out of date.
+
+    Only those tasks are updated. With ``touch``, they are also marked changed:
+    ``updated_at`` moves and the change feed records them. A backfill passes
+    ``touch=False``, so correcting the counts neither delays archiving nor
+    floods the change feed.
+    """
+    comments = Comment.objects.filter(task=OuterRef("pk")).order_by().values("task")
+    activity = {
+        "comment_count": Coalesce(
+            Subquery(comments.annotate(count=Count("id")).values("count")), 0
+        ),
+        "last_commented_at": Subquery(
+            comments.annotate(last=Max("updated_at")).values("last")
+        ),
+    }
+    stale = [
+        row["id"]
+        for row in Task.objects.filter(pk__in=list(task_ids))
+        .annotate(**{f"new_{name}": value for name, value in activity.items()})
+        .values("id", *activity, *(f"new_{name}" for name in activity))
+        if any(row[name] != row[f"new_{name}"] for name in activity)
+    ]
+    if not stale:
+        return 0
+
+    if touch:
+        activity["updated_at"] = timezone.now()
+    updated = Task.objects.filter(pk__in=stale).update(**activity)
+    invalidate_tasks(stale)
+    if touch:
+        record_changes(stale)
+    return updated
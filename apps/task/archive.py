@@ -0,0 +1,66 @@
+from collections.abc import Iterable
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+
+from apps.task.cache import invalidate_tasks
+from apps.task.changes import record_changes
+from apps.task.models import ArchivedComment, ArchivedTask, Comment, Task
+
+ARCHIVED_TASK_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "status",
+    "user_id",
+    "is_completed",
+    "updated_at",
+    "comment_count",
+    "last_commented_at",
+)
+ARCHIVED_COMMENT_FIELDS = ("id", "text", "task_id", "user_id", "updated_at")
+
+
+def archivable_tasks(statuses: Iterable[str], before: datetime) -> QuerySet:
+    return Task.objects.filter(status__in=list(statuses), updated_at__lt=before)
+
+
+def archive_tasks(queryset: QuerySet) -> list[int]:
+    """
+    Move the tasks of ``queryset`` and their comments to the archive tables, and
+    return their ids.
+
+    Rows are copied and deleted in one transaction, so a task is always in
+    exactly one of the tables. The deletes bypass the collector and the model
+    signals, which would load every row and record, invalidate and announce each
+    task on its own. The caches and the change feed are updated once for the
+    whole chunk instead, and the feed reports the tasks with their archived data.
+    """
+    with transaction.atomic():
+        tasks = [
+            ArchivedTask(**row)
+            for row in queryset.select_for_update().values(*ARCHIVED_TASK_FIELDS)
+        ]
+        if not tasks:
+            return []
+        ids = [task.id for task in tasks]
+        ArchivedTask.objects.bulk_create(tasks)
+
+        comments = Comment.objects.filter(task_id__in=ids)
+        ArchivedComment.objects.bulk_create(
+            [
+                ArchivedComment(**row)
+                for row in comments.values(*ARCHIVED_COMMENT_FIELDS)
+            ],
+            batch_size=settings.TASK_BULK_CHUNK_SIZE,
+        )
+        # Comments are the only rows referencing a task, deleted first.
+        comments._raw_delete(comments.db)
+        live = Task.objects.filter(id__in=ids)
+        live._raw_delete(live.db)
+
+        invalidate_tasks(ids)
+        record_changes(ids, [task.user_id for task in tasks])
+    return ids
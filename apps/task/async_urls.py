@@ -0,0 +1,30 @@
+from django.urls import path
+
+from apps.task.async_views import (
+    AsyncCompleteTaskView,
+    AsyncTaskCommentsView,
+    AsyncTaskDetailView,
+    AsyncTaskEventsView,
+    AsyncTaskListView,
+    AsyncTaskPollView,
+    AsyncTaskSearchView,
+)
+
+urlpatterns = [
+    path("tasks", AsyncTaskListView.as_view(), name="tasks"),
+    path("tasks/search", AsyncTaskSearchView.as_view(), name="tasks-search"),
+    # Only served by the ASGI deployment, a WSGI worker would be held per client.
+    path("tasks/events", AsyncTaskEventsView.as_view(), name="tasks-events"),
+    path("tasks/events/poll", AsyncTaskPollView.as_view(), name="tasks-events-poll"),
+    path("tasks/<int:id>", AsyncTaskDetailView.as_view(), name="tasks-get-by-id"),
+    path(
+        "tasks/<int:id>/complete",
+        AsyncCompleteTaskView.as_view(),
+        name="tasks-complete",
+    ),
+    path(
+        "tasks/<int:id>/comments",
+        AsyncTaskCommentsView.as_view(),
+        name="tasks-comments",
+    ),
+]
@@ -0,0 +1,340 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotAuthenticated, Throttled
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from apps.common.conditional import make_etag, not_modified, with_validators
+from apps.common.events import get_broker
+from apps.common.pagination import IdCursorPagination, RankedPagination
+from apps.common.throttling import TokenBucketThrottle
+from apps.task.cache import aget_or_load, aget_task_version, request_cache_key
+from apps.task.changes import current_sequence
+from apps.task.models import ArchivedTask, Comment, Task
+from apps.task.search import get_search_backend
+from apps.task.serializers import (
+    CommentSerializer,
+    TaskEventsQuerySerializer,
+    TaskSerializer,
+)
+from apps.task.views import (
+    GetAllTaskCommentsView,
+    GetTaskView,
+    TaskListCreateView,
+    TaskSearchView,
+    complete_task,
+    filter_tasks,
+    include_archived,
+    task_changes,
+)
+from apps.users.authentication import AsyncJWTAuthentication
+
+
+def json_response(data, status: int = 200) -> HttpResponse:
+    # Rendered like DRF's Response so both deployments return identical bodies.
+    return HttpResponse(
+        JSONRenderer().render(data), status=status, content_type="application/json"
+    )
+
+
+async def aversioned_response(
+    request, task_id: int, name: str, load: Callable[[], Awaitable[dict]]
+) -> HttpResponse:
+    """
+    Async counterpart of ``versioned_response``, sharing its cache entries and
+    ETags.
+    """
+    url = request.build_absolute_uri()
+    version = await aget_task_version(task_id)
+    etag = make_etag(name, version, url)
+    if request.headers.get("If-None-Match"):
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+    entry = await aget_or_load(request_cache_key(task_id, name, url, version), load)
+    return not_modified(request, etag, entry["updated_at"]) or with_validators(
+        json_response(entry["data"]), etag, entry["updated_at"]
+    )
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncAPIView(View):
+    """
+    Async view authenticated with a JWT like the DRF views.
+
+    Methods without an async handler are passed to the synchronous DRF
+    ``fallback_view``, so one URL can serve async reads next to sync writes.
+    Handlers are throttled by ``throttle_scope`` like the DRF views.
+    """
+
+    fallback_view = None
+    authentication = AsyncJWTAuthentication()
+    throttle_scope = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        handler = getattr(self, method, None) if method != "options" else None
+        if handler is None or method not in self.http_method_names:
+            if self.fallback_view is not None:
+                return await sync_to_async(self.fallback_view)(request, *args, **kwargs)
+            return await self.http_method_not_allowed(request, *args, **kwargs)
+
+        request = Request(request)
+        try:
+            user_auth = await self.authentication.aauthenticate(request)
+            if user_auth is None:
+                raise NotAuthenticated
+            request.user, request.auth = user_auth
+            await self.check_throttles(request)
+            return await handler(request, *args, **kwargs)
+        except APIException as e:
+            return self.handle_exception(request, e)
+        except Http404 as e:
+            return json_response({"detail": str(e) or "Not found."}, status=404)
+
+    async def check_throttles(self, request) -> None:
+        throttle = TokenBucketThrottle()
+        if not await throttle.aallow_request(request, self):
+            raise Throttled(throttle.wait())
+
+    def handle_exception(self, request, exc: APIException) -> HttpResponse:
+        data = exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}
+        response = json_response(data, status=exc.status_code)
+        if exc.status_code == 401:
+            response["WWW-Authenticate"] = self.authentication.authenticate_header(
+                request
+            )
+        if getattr(exc, "wait", None):
+            response["Retry-After"] = str(exc.wait)
+        return response
+
+
+class AsyncTaskListView(AsyncAPIView):
+    fallback_view = staticmethod(TaskListCreateView.as_view())
+
+    async def get(self, request):
+        querysets = [filter_tasks(Task.objects.all(), request.query_params)]
+        if include_archived(request.query_params):
+            querysets.append(
+                filter_tasks(ArchivedTask.objects.all(), request.query_params)
+            )
+        paginator = IdCursorPagination()
+        page = await paginator.apaginate_querysets(querysets, request)
+        etag = make_etag(
+            paginator.get_next_link(),
+            paginator.get_previous_link(),
+            [(task.id, task.updated_at) for task in page],
+        )
+
+        return not_modified(request, etag) or with_validators(
+            json_response(
+                paginator.get_paginated_data(TaskSerializer(page, many=True).data)
+            ),
+            etag,
+        )
+
+
+class AsyncTaskDetailView(AsyncAPIView):
+    fallback_view = staticmethod(GetTaskView.as_view())
+
+    async def get(self, request, id: int):
+        async def load() -> dict:
+            task = await Task.objects.filter(pk=id).afirst()
+            if task is None:
+                task = await ArchivedTask.objects.filter(pk=id).afirst()
+            if task is None:
+                raise Http404("No Task matches the given query.")
+            return {
+                "data": dict(TaskSerializer(task).data),
+                "updated_at": task.updated_at,
+            }
+
+        return await aversioned_response(request, id, "detail", load)
+
+
+class AsyncTaskCommentsView(AsyncAPIView):
+    fallback_view = staticmethod(GetAllTaskCommentsView.as_view())
+
+    async def get(self, request, id: int):
+        async def load() -> dict:
+            paginator = IdCursorPagination()
+            page = await paginator.apaginate_queryset(
+                Comment.objects.filter(task_id=id).only("id", "text"),
+                request,
+            )
+            if not page and not await Task.objects.filter(pk=id).aexists():
+                raise Http404
+            return {
+                "data": paginator.get_paginated_data(
+                    CommentSerializer(page, many=True).data
+                ),
+                "updated_at": None,
+            }
+
+        return await aversioned_response(request, id, "comments", load)
+
+
+class AsyncTaskSearchView(AsyncAPIView):
+    fallback_view = staticmethod(TaskSearchView.as_view())
+    throttle_scope = TaskSearchView.throttle_scope
+
+    async def get(self, request):
+        paginator = RankedPagination()
+        queryset = get_search_backend().search(
+            Task.objects.all(), request.query_params.get("query", "")
+        )
+        page = await paginator.apaginate_queryset(queryset, request)
+        return json_response(
+            paginator.get_paginated_data(TaskSerializer(page, many=True).data)
+        )
+
+
+class AsyncCompleteTaskView(AsyncAPIView):
+    throttle_scope = "tasks_write"
+
+    async def post(self, request, id: int):
+        task = await Task.objects.filter(pk=id).afirst()
+        if task is None:
+            raise Http404("No Task matches the given query.")
+        # Django has no async transactions, so the write and the outbox insert
+        # take one thread hop together.
+        await sync_to_async(complete_task)(task)
+        return HttpResponse(status=204)
+
+
+async def read_subscription(request) -> tuple[int, dict, int]:
+    """
+    Sequence number to start after, subscription and long-poll wait of an event
+    request.
+
+    Without ``tasks`` or ``user_id`` the request subscribes to the tasks of its
+    user. A ``Last-Event-ID`` header, sent by reconnecting EventSource clients,
+    wins over ``since``. Without either, only future changes are returned.
+    """
+    query = TaskEventsQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    params = query.validated_data
+
+    task_ids = set(params.get("tasks", ()))
+    user_id = params.get("user_id")
+    if not task_ids and user_id is None:
+        user_id = int(request.user.id)
+
+    since = params.get("since")
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    if since is None:
+        since = await sync_to_async(current_sequence)()
+    return since, {"task_ids": task_ids, "user_id": user_id}, params["wait"]
+
+
+def concerns(message: dict, subscription: dict) -> bool:
+    task_ids = message["task_ids"]
+    # Both are None for batches too large to announce.
+    return (
+        task_ids is None
+        or not subscription["task_ids"].isdisjoint(task_ids)
+        or subscription["user_id"] in message["user_ids"]
+    )
+
+
+async def wait_for_changes(
+    queue: asyncio.Queue, subscription: dict, timeout: float
+) -> bool:
+    """
+    Wait up to ``timeout`` seconds for a broker message that may concern the
+    subscription.
+    """
+    try:
+        async with asyncio.timeout(timeout):
+            while not concerns(await queue.get(), subscription):
+                pass
+    except TimeoutError:
+        return False
+    # The feed read that follows covers the messages queued in the meantime.
+    while not queue.empty():
+        queue.get_nowait()
+    return True
+
+
+def sse_event(change: dict) -> str:
+    data = JSONRenderer().render(change).decode()
+    return f"id: {change['seq']}\nevent: task\ndata: {data}\n\n"
+
+
+class AsyncTaskEventsView(AsyncAPIView):
+    """
+    Server-Sent Events stream of the changes to the subscribed tasks.
+
+    Every event is an entry of the change feed, with its sequence number as the
+    event id. Broker messages only wake the stream up, the changes themselves
+    are always read from the feed, so nothing is lost between reconnects.
+    """
+
+    async def get(self, request):
+        since, subscription, _ = await read_subscription(request)
+        response = StreamingHttpResponse(
+            self.stream(since, subscription), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # Tell nginx not to buffer the stream.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @staticmethod
+    async def stream(since: int, subscription: dict) -> AsyncIterator[str]:
+        broker = get_broker()
+        queue = broker.subscribe()
+        try:
+            while True:
+                data = await sync_to_async(task_changes)(
+                    since, settings.TASK_CHANGES_PAGE_SIZE, **subscription
+                )
+                for change in data["results"]:
+                    yield sse_event(change)
+                since = data["since"]
+                if data["has_more"]:
+                    continue
+                if not await wait_for_changes(
+                    queue, subscription, settings.TASK_EVENTS_HEARTBEAT
+                ):
+                    yield ": keep-alive\n\n"
+        finally:
+            broker.unsubscribe(queue)
+
+
+class AsyncTaskPollView(AsyncAPIView):
+    """
+    Long-poll fallback of the event stream.
+
+    Answers like ``/tasks/changes`` as soon as a subscribed task changes, or
+    with no results after ``wait`` seconds.
+    """
+
+    async def get(self, request):
+        since, subscription, wait = await read_subscription(request)
+        broker = get_broker()
+        queue = broker.subscribe()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        try:
+            while True:
+                data = await sync_to_async(task_changes)(
+                    since, settings.TASK_CHANGES_PAGE_SIZE, **subscription
+                )
+                remaining = deadline - loop.time()
+                if data["results"] or data["has_more"] or remaining <= 0:
+                    return json_response(data)
+                since = data["since"]
+                await wait_for_changes(queue, subscription, remaining)
+        finally:
+            broker.unsubscribe(queue)
@@ -0,0 +1,260 @@
+import asyncio
+import random
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Max, QuerySet
+from django.test import AsyncClient, Client, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.common.benchmark import (
+    ameasure_concurrent,
+    create_users,
+    get_driver,
+    measure,
+    measure_concurrent,
+    measure_requests,
+    scenario,
+)
+from apps.common.renderers import FastJSONRenderer
+from apps.task.activity import refresh_comment_activity
+from apps.task.models import Comment, Task
+from apps.task.serializers import TaskSerializer
+from apps.task.views import TASK_VALUES
+
+SYLLABLES = "ka lo mi nu pe ra si to vu we xa yo ze bi da fo gu hi jo ly".split()
+# 8000 synthetic words, so every word matches a small share of a large corpus the
+# way real vocabulary does.
+WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+
+
+def create_tasks(owners: list[User], count: int, chunk_size: int = 10_000) -> None:
+    rng = random.Random(count)
+    for start in range(0, count, chunk_size):
+        Task.objects.bulk_create(
+            Task(
+                title=" ".join(rng.choices(WORDS, k=3)),
+                description=" ".join(rng.choices(WORDS, k=20)),
+                user=owners[i % len(owners)],
+            )
+            for i in range(start, min(start + chunk_size, count))
+        )
+
+
+def create_comments(
+    users: list[User], tasks: QuerySet, per_task: int, chunk_size: int = 1_000
+) -> None:
+    """
+    Add ``per_task`` comments by random ``users`` to every task of ``tasks``.
+    """
+    rng = random.Random(per_task)
+    task_ids = tasks.values_list("id", flat=True).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(task_ids, chunk_size)):
+        Comment.objects.bulk_create(
+            Comment(
+                text=" ".join(rng.choices(WORDS, k=10)),
+                task_id=task_id,
+                user=rng.choice(users),
+            )
+            for task_id in chunk
+            for _ in range(per_task)
+        )
+        refresh_comment_activity(chunk, touch=False)
+
+
+@scenario("completion_fanout")
+def completion_fanout(options: dict) -> list[dict]:
+    """
+    Cost of completing a task as the number of distinct commenters grows.
+    """
+    owner = User.objects.create(username="bench-owner", email="owner@bench.local")
+    client = APIClient()
+    client.force_authenticate(user=owner)
+
+    rows = []
+    for size in options["sizes"]:
+        task = Task.objects.create(title="Bench", description="Bench", user=owner)
+        users = User.objects.bulk_create(
+            User(username=f"bench-{task.id}-{i}", email=f"{task.id}-{i}@bench.local")
+            for i in range(size)
+        )
+        Comment.objects.bulk_create(
+            Comment(text="Comment", task=task, user=user) for user in users
+        )
+        url = reverse("tasks-complete", kwargs={"id": task.id})
+        stats = measure(lambda url=url: client.post(url), options["iterations"])
+        rows.append({"commenters": size, **stats})
+    return rows
+
+
+@scenario("search")
+def search(options: dict) -> list[dict]:
+    """
+    Latency of ranked task search as the corpus grows.
+    """
+    owner = User.objects.create(username="bench-search", email="search@bench.local")
+    client = APIClient()
+    client.force_authenticate(user=owner)
+
+    rows = []
+    indexed = 0
+    for size in options["sizes"]:
+        create_tasks([owner], size - indexed)
+        indexed = size
+        for query in ("kalomi", "pera", "sitovu zebida"):
+            stats = measure(
+                lambda query=query: client.get(
+                    reverse("tasks-search"), {"query": query}
+                ),
+                options["iterations"],
+            )
+            rows.append({"tasks": size, "query": query, **stats})
+    return rows
+
+
+@scenario("stats")
+def stats(options: dict) -> list[dict]:
+    """
+    Latency of the task statistics aggregates as the table grows, computed on
+    every request and served from the cache.
+    """
+    owners = User.objects.bulk_create(
+        User(username=f"bench-stats-{i}", email=f"stats-{i}@bench.local")
+        for i in range(10)
+    )
+    client = APIClient()
+    client.force_authenticate(user=owners[0])
+
+    rows = []
+    created = 0
+    for size in options["sizes"]:
+        # Spread over the owners so the per-user grouping has work to do.
+        create_tasks(owners, size - created)
+        created = size
+        for timeout in (0, 30):
+            cache.clear()
+            with override_settings(TASK_STATS_CACHE_TIMEOUT=timeout):
+                result = measure(
+                    lambda: client.get(reverse("tasks-stats")), options["iterations"]
+                )
+            rows.append({"tasks": size, "cached": bool(timeout), **result})
+    return rows
+
+
+@scenario("asgi")
+def asgi(options: dict) -> list[dict]:
+    """
+    Throughput and latency of the hot read endpoints under concurrent load, served
+    by the sync views (WSGI) and by the async views (ASGI).
+    """
+    owner = User.objects.create(username="bench-asgi", email="asgi@bench.local")
+    token = f"Bearer {AccessToken.for_user(owner)}"
+    task = Task.objects.create(title="Bench", description="Bench", user=owner)
+    Comment.objects.create(text="Comment", task=task, user=owner)
+    urls = {
+        "list": reverse("tasks"),
+        "detail": reverse("tasks-get-by-id", kwargs={"id": task.id}),
+        "comments": reverse("tasks-comments", kwargs={"id": task.id}),
+        "search": reverse("tasks-search") + "?query=kalomi",
+    }
+    iterations, concurrency = options["iterations"], options["concurrency"]
+
+    rows = []
+    created = 0
+    for size in options["sizes"]:
+        create_tasks([owner], size - created)
+        created = size
+        for endpoint, url in urls.items():
+            wsgi = measure_concurrent(
+                lambda url=url: Client().get(url, HTTP_AUTHORIZATION=token),
+                iterations,
+                concurrency,
+            )
+            with override_settings(ROOT_URLCONF="config.urls_asgi"):
+                asgi = asyncio.run(
+                    ameasure_concurrent(
+                        lambda url=url: AsyncClient().get(url, AUTHORIZATION=token),
+                        iterations,
+                        concurrency,
+                    )
+                )
+            rows.append({"tasks": size, "endpoint": endpoint, "server": "wsgi", **wsgi})
+            rows.append({"tasks": size, "endpoint": endpoint, "server": "asgi", **asgi})
+    return rows
+
+
+@scenario("serialization")
+def serialization(options: dict) -> list[dict]:
+    """
+    Cost of fetching, serializing and rendering task lists through TaskSerializer
+    and through the .values() fast path.
+    """
+    owner = User.objects.create(username="bench-fast", email="fast@bench.local")
+
+    def model_path(size: int) -> bytes:
+        tasks = Task.objects.order_by("id")[:size]
+        return JSONRenderer().render(TaskSerializer(tasks, many=True).data)
+
+    def fast_path(size: int) -> bytes:
+        rows = Task.objects.order_by("id").values(*TASK_VALUES.columns)[:size]
+        return FastJSONRenderer().render(TASK_VALUES.to_representation(rows))
+
+    rows = []
+    created = 0
+    for size in options["sizes"]:
+        create_tasks([owner], size - created)
+        created = size
+        assert model_path(size) == fast_path(size)
+        for name, path in (("serializer", model_path), ("values", fast_path)):
+            stats = measure(
+                lambda path=path, size=size: path(size), options["iterations"]
+            )
+            rows.append({"rows": size, "path": name, **stats})
+    return rows
+
+
+@scenario("api")
+def api(options: dict) -> list[dict]:
+    """
+    Throughput, latency and queries per request of the task, comment, search and
+    user read endpoints as the dataset grows.
+
+    The dataset is seeded from the users fixture. Requests go through the test
+    client, or over HTTP with ``--live-server``.
+    """
+    call_command("loaddata", "users", verbosity=0)
+    user = User.objects.get(email="user1@email.com")
+    users = [user, *create_users(options["users"])]
+    driver = get_driver(options, f"Bearer {AccessToken.for_user(user)}")
+
+    rows = []
+    created = 0
+    for size in options["sizes"]:
+        last_id = Task.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+        create_tasks(users, size - created)
+        create_comments(users, Task.objects.filter(id__gt=last_id), 3)
+        created = size
+        cache.clear()
+
+        task_id = Task.objects.order_by("id").values_list("id", flat=True)[size // 2]
+        urls = {
+            "tasks": reverse("tasks"),
+            "tasks_by_user": reverse("tasks") + f"?user_id={users[1].id}",
+            "task": reverse("tasks-get-by-id", kwargs={"id": task_id}),
+            "comments": reverse("tasks-comments", kwargs={"id": task_id}),
+            "search": reverse("tasks-search") + "?query=kalomi",
+            "stats": reverse("tasks-stats"),
+            "users": reverse("get_all_users"),
+            "users_search": reverse("get_all_users") + "?search=bench1",
+        }
+        for endpoint, url in urls.items():
+            stats = measure_requests(
+                driver, url, options["iterations"], options["concurrency"]
+            )
+            rows.append({"tasks": size, "endpoint": endpoint, **stats})
+    return rows
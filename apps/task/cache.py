@@ -0,0 +1,72 @@
+import hashlib
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.common.cache import aget_version, get_version
+
+# Per-process hit/miss counters of the task read cache.
+CACHE_STATS = Counter()
+
+
+def version_key(task_id: int) -> str:
+    return f"task:{task_id}:version"
+
+
+def get_task_version(task_id: int) -> str:
+    return get_version(version_key(task_id))
+
+
+async def aget_task_version(task_id: int) -> str:
+    return await aget_version(version_key(task_id))
+
+
+def invalidate_tasks(task_ids: Iterable[int]) -> None:
+    """
+    Drop the cache version of the given tasks, orphaning every entry cached for
+    them.
+
+    Runs again once the surrounding transaction commits, so a read that cached
+    uncommitted-away data in between is orphaned as well.
+    """
+    keys = [version_key(task_id) for task_id in task_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def task_cache_key(task_id: int, name: str, version: str | None = None) -> str:
+    return f"task:{task_id}:{version or get_task_version(task_id)}:{name}"
+
+
+def request_cache_key(
+    task_id: int, name: str, url: str, version: str | None = None
+) -> str:
+    digest = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+    return task_cache_key(task_id, f"{name}:{digest}", version)
+
+
+def get_or_load(key: str, loader: Callable):
+    value = cache.get(key)
+    if value is not None:
+        CACHE_STATS["hits"] += 1
+        return value
+    CACHE_STATS["misses"] += 1
+    value = loader()
+    cache.set(key, value, settings.TASK_CACHE_TIMEOUT)
+    return value
+
+
+async def aget_or_load(key: str, loader: Callable[[], Awaitable]):
+    value = await cache.aget(key)
+    if value is not None:
+        CACHE_STATS["hits"] += 1
+        return value
+    CACHE_STATS["misses"] += 1
+    value = await loader()
+    await cache.aset(key, value, settings.TASK_CACHE_TIMEOUT)
+    return value
@@ -0,0 +1,74 @@
+from collections.abc import Iterable
+
+from django.db import connection, transaction
+
+from apps.common.events import WAKE_ALL, get_broker
+from apps.task.models import Task, TaskChange
+
+# Key of the PostgreSQL advisory lock taken by transactions recording changes.
+CHANGE_LOCK_KEY = 0x7461736B
+
+# Larger batches of changed tasks are announced without their ids and users,
+# waking up every stream.
+MAX_ANNOUNCED_IDS = 1000
+
+
+def record_changes(
+    task_ids: Iterable[int], user_ids: Iterable[int] | None = None
+) -> None:
+    """
+    Append a change of every given task to the change feed.
+
+    Sequence numbers must become visible in order, or a client could move its
+    token past a change that commits later. SQLite serializes writers already;
+    on PostgreSQL an advisory lock held until commit does the same for the
+    transactions recording changes.
+
+    Open event streams are told about the changes, and the users the tasks
+    belong to, once they are committed. Callers that know the users pass
+    ``user_ids``, the others have them read from the tasks.
+    """
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    with transaction.atomic(savepoint=False):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CHANGE_LOCK_KEY])
+        TaskChange.objects.bulk_create(
+            TaskChange(task_id=task_id) for task_id in task_ids
+        )
+    if len(task_ids) <= MAX_ANNOUNCED_IDS:
+        if user_ids is None:
+            user_ids = Task.objects.filter(id__in=task_ids).values_list(
+                "user_id", flat=True
+            )
+        message = {"task_ids": task_ids, "user_ids": sorted(set(user_ids))}
+    else:
+        message = WAKE_ALL
+    # A broker outage must not fail the write, streams catch up on their own.
+    transaction.on_commit(lambda: get_broker().publish(message), robust=True)
+
+
+def changes_since(since: int, limit: int) -> tuple[dict[int, int], bool]:
+    """
+    Latest sequence number of every task changed after ``since``, reading at most
+    ``limit`` changes, and whether more changes follow.
+
+    Tasks are ordered by their latest change, so a client applying them in order
+    can stop anywhere and resume from the last sequence it applied.
+    """
+    changes = list(
+        TaskChange.objects.filter(id__gt=since)
+        .order_by("id")
+        .values_list("id", "task_id")[: limit + 1]
+    )
+    latest = {}
+    for seq, task_id in changes[:limit]:
+        latest.pop(task_id, None)
+        latest[task_id] = seq
+    return latest, len(changes) > limit
+
+
+def current_sequence() -> int:
+    return TaskChange.objects.order_by("-id").values_list("id", flat=True).first() or 0
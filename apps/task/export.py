@@ -0,0 +1,111 @@
+import csv
+from collections.abc import AsyncIterator, Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import QuerySet
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+TASK_EXPORT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "status",
+    "is_completed",
+    "user_id",
+    "comment_count",
+    "last_commented_at",
+)
+COMMENT_EXPORT_FIELDS = ("id", "task_id", "user_id", "text", "updated_at")
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Selects the export format. Rows are streamed by the view, so this only
+    renders error responses, as a single JSON line.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return (JSONEncoder(ensure_ascii=False).encode(data) + "\n").encode()
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class Echo:
+    """
+    File-like object whose ``write`` returns the value, for ``csv.writer``.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def ndjson_lines(fields: tuple[str, ...], rows: Iterable[tuple]) -> Iterator[str]:
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row, strict=True))) + "\n"
+
+
+def csv_lines(fields: tuple[str, ...], rows: Iterable[tuple]) -> Iterator[str]:
+    # Datetimes are written the way the JSON API renders them.
+    encoder = JSONEncoder()
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(
+            [
+                encoder.default(value) if isinstance(value, datetime) else value
+                for value in row
+            ]
+        )
+
+
+def stream_export(
+    queryset: QuerySet, fields: tuple[str, ...], export_format: str
+) -> Iterator[bytes]:
+    """
+    Encode ``fields`` of every row of ``queryset`` as NDJSON or CSV.
+
+    Rows are read with a server-side cursor and encoded one chunk at a time, so
+    memory use does not depend on the number of rows.
+    """
+    chunk_size = settings.TASK_EXPORT_CHUNK_SIZE
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    lines = (csv_lines if export_format == "csv" else ndjson_lines)(fields, rows)
+    while chunk := list(islice(lines, chunk_size)):
+        yield "".join(chunk).encode()
+
+
+async def astream_export(
+    queryset: QuerySet, fields: tuple[str, ...], export_format: str
+) -> AsyncIterator[bytes]:
+    """
+    ``stream_export`` for ASGI requests, given a synchronous iterator Django
+    would read the whole export into a list before sending it.
+
+    Every chunk is read in the request's worker thread, which keeps the
+    server-side cursor and the connection it belongs to.
+    """
+    chunks = stream_export(queryset, fields, export_format)
+    read = sync_to_async(next)
+    try:
+        while (chunk := await read(chunks, None)) is not None:
+            yield chunk
+    finally:
+        # Closes the cursor when the client disconnects early.
+        await sync_to_async(chunks.close)()
@@ -0,0 +1,156 @@
+import csv
+import json
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import IO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import Serializer
+
+from apps.task.activity import refresh_comment_activity
+from apps.task.changes import record_changes
+from apps.task.models import ArchivedTask, Comment, Task
+from apps.task.serializers import CommentImportSerializer, TaskImportSerializer
+
+
+def read_rows(file: IO[str], file_format: str) -> Iterator[tuple[int, dict | None]]:
+    """
+    Yield ``(line number, row)`` pairs from an NDJSON or CSV file, one at a time.
+
+    Rows that cannot be parsed are yielded as ``None``. Empty CSV cells are left
+    out of the row, so they mean the same as a missing NDJSON key.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, {k: v for k, v in row.items() if v != ""}
+        return
+
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def detect_format(path: Path) -> str:
+    return "csv" if path.suffix.lower() == ".csv" else "ndjson"
+
+
+class Importer:
+    """
+    Validates rows with a serializer and inserts them with chunked
+    ``bulk_create``, one transaction per chunk.
+
+    Rows failing validation are passed to ``reject`` together with their errors.
+    """
+
+    model = None
+    serializer_class: type[Serializer] = None
+
+    def __init__(self, chunk_size: int, reject: Callable[[int, dict, dict], None]):
+        self.chunk_size = chunk_size
+        self.reject = reject
+        users = dict(User.objects.values_list("username", "id"))
+        self.serializer = self.serializer_class(
+            context={"usernames": users, "user_ids": set(users.values())}
+        )
+        self.imported = 0
+        self.rejected = 0
+
+    def run(self, rows: Iterator[tuple[int, dict | None]]) -> None:
+        chunk = []
+        for line_number, row in rows:
+            if row is None:
+                self.reject_row(line_number, row, {"non_field_errors": ["Bad row."]})
+                continue
+            try:
+                # One serializer validates every row, so its fields are only
+                # built once.
+                attrs = self.serializer.run_validation(row)
+            except ValidationError as e:
+                self.reject_row(line_number, row, e.detail)
+                continue
+            chunk.append((line_number, row, attrs))
+            if len(chunk) >= self.chunk_size:
+                self.flush(chunk)
+                chunk = []
+        if chunk:
+            self.flush(chunk)
+
+    def reject_row(self, line_number: int, row: dict | None, errors) -> None:
+        self.rejected += 1
+        self.reject(line_number, row, errors)
+
+    def flush(self, chunk: list[tuple[int, dict, dict]]) -> None:
+        with transaction.atomic():
+            accepted = self.check_chunk(chunk)
+            created = self.model.objects.bulk_create(
+                [self.model(**attrs) for _, _, attrs in accepted],
+                batch_size=settings.TASK_BULK_CHUNK_SIZE,
+            )
+            self.after_insert(created)
+        self.imported += len(accepted)
+
+    def check_chunk(self, chunk: list[tuple[int, dict, dict]]) -> list:
+        """
+        Drop rows that conflict with the database, with one query per chunk.
+        """
+        return chunk
+
+    def after_insert(self, objs: list) -> None:
+        pass
+
+
+class TaskImporter(Importer):
+    model = Task
+    serializer_class = TaskImportSerializer
+
+    def check_chunk(self, chunk):
+        ids = [attrs["id"] for _, _, attrs in chunk if "id" in attrs]
+        taken = set(Task.objects.filter(id__in=ids).values_list("id", flat=True))
+        # Archived tasks keep their ids.
+        taken.update(
+            ArchivedTask.objects.filter(id__in=ids).values_list("id", flat=True)
+        )
+        accepted = []
+        for line_number, row, attrs in chunk:
+            if attrs.get("id") in taken:
+                self.reject_row(line_number, row, {"id": ["Task already exists."]})
+                continue
+            if "id" in attrs:
+                taken.add(attrs["id"])
+            accepted.append((line_number, row, attrs))
+        return accepted
+
+    def after_insert(self, objs):
+        record_changes((task.id for task in objs), (task.user_id for task in objs))
+
+
+class CommentImporter(Importer):
+    model = Comment
+    serializer_class = CommentImportSerializer
+
+    def check_chunk(self, chunk):
+        task_ids = {attrs["task_id"] for _, _, attrs in chunk}
+        found = set(Task.objects.filter(id__in=task_ids).values_list("id", flat=True))
+        accepted = []
+        for line_number, row, attrs in chunk:
+            if attrs["task_id"] not in found:
+                self.reject_row(line_number, row, {"task_id": ["Task not found."]})
+                continue
+            accepted.append((line_number, row, attrs))
+        return accepted
+
+    def after_insert(self, objs):
+        # bulk_create skips the signals that maintain the comment activity.
+        refresh_comment_activity({comment.task_id for comment in objs})
+
+
+IMPORTERS = {"tasks": TaskImporter, "comments": CommentImporter}
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.task.archive import archivable_tasks, archive_tasks
+from apps.task.models import Task
+
+
+class Command(BaseCommand):
+    help = "Move finished tasks and their comments to the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.TASK_ARCHIVE_AFTER_DAYS,
+            help="Archive tasks not updated for this many days.",
+        )
+        parser.add_argument(
+            "--status",
+            action="append",
+            choices=Task.Status.values,
+            help="Status of the tasks to archive, may be repeated. Defaults to "
+            "TASK_ARCHIVE_STATUSES.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Tasks archived per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = archivable_tasks(
+            options["status"] or settings.TASK_ARCHIVE_STATUSES,
+            timezone.now() - timedelta(days=options["days"]),
+        )
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(
+                queryset.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[: options["chunk_size"]]
+            )
+            if not ids:
+                break
+            # The criteria are checked again under lock, skipping tasks that
+            # changed since.
+            total += len(archive_tasks(queryset.filter(id__in=ids)))
+            last_id = ids[-1]
+            self.stdout.write(f"Archived {total} task(s)")
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.task.activity import refresh_comment_activity
+from apps.task.models import Task
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized comment count and activity of every task."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Tasks recomputed per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(
+                Task.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[: options["chunk_size"]]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                total += refresh_comment_activity(ids, touch=False)
+            last_id = ids[-1]
+            self.stdout.write(f"Corrected {total} task(s)")
@@ -0,0 +1,76 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection
+
+from apps.task.importer import IMPORTERS, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import tasks or comments from an NDJSON or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON or CSV file to import.")
+        parser.add_argument(
+            "--kind",
+            choices=sorted(IMPORTERS),
+            default="tasks",
+            help="What the file contains.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=("ndjson", "csv"),
+            help="File format. Detected from the file extension when omitted.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Rows inserted per transaction.",
+        )
+        parser.add_argument(
+            "--rejects",
+            help="NDJSON file receiving rejected rows and their errors. Defaults to "
+            "<path>.rejects.ndjson.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"{path} does not exist.")
+        file_format = options["format"] or detect_format(path)
+        rejects_path = Path(options["rejects"] or f"{path}.rejects.ndjson")
+
+        start = time.perf_counter()
+        with (
+            path.open(newline="", encoding="utf-8") as file,
+            rejects_path.open("w", encoding="utf-8") as rejects,
+        ):
+
+            def reject(line_number: int, row: dict | None, errors) -> None:
+                rejects.write(
+                    json.dumps({"line": line_number, "row": row, "errors": errors})
+                    + "\n"
+                )
+
+            importer = IMPORTERS[options["kind"]](options["chunk_size"], reject)
+            importer.run(read_rows(file, file_format))
+
+        # Explicit ids leave database sequences behind, as after loaddata.
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [importer.model]):
+                cursor.execute(sql)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"Imported {importer.imported} {options['kind']} in {elapsed:.2f}s "
+            f"({(importer.imported + importer.rejected) / elapsed:.0f} rows/s), "
+            f"{importer.rejected} rejected"
+        )
+        if not importer.rejected:
+            rejects_path.unlink()
+        else:
+            self.stdout.write(f"Rejected rows written to {rejects_path}")
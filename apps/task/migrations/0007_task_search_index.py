@@ -0,0 +1,70 @@
+from django.db import migrations
+
+# The DDL is frozen here instead of imported, so later changes to the search
+# module cannot change what this migration does.
+FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS task_task_fts USING fts5(
+        title, description, content='task_task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+    )
+    """,
+    *[
+        "DROP TRIGGER IF EXISTS task_task_fts_ai",
+        "DROP TRIGGER IF EXISTS task_task_fts_ad",
+        "DROP TRIGGER IF EXISTS task_task_fts_au",
+        """
+    CREATE TRIGGER task_task_fts_ai AFTER INSERT ON task_task BEGIN
+        INSERT INTO task_task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+        """
+    CREATE TRIGGER task_task_fts_ad AFTER DELETE ON task_task BEGIN
+        INSERT INTO task_task_fts(task_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+        """
+    CREATE TRIGGER task_task_fts_au AFTER UPDATE OF title, description ON task_task
+    BEGIN
+        INSERT INTO task_task_fts(task_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO task_task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+        "INSERT INTO task_task_fts(task_task_fts) VALUES ('rebuild')",
+    ],
+]
+
+DROP_FTS_SQL = [
+    "DROP TRIGGER IF EXISTS task_task_fts_ai",
+    "DROP TRIGGER IF EXISTS task_task_fts_ad",
+    "DROP TRIGGER IF EXISTS task_task_fts_au",
+    "DROP TABLE IF EXISTS task_task_fts",
+]
+
+
+class RunSQLiteSQL(migrations.RunSQL):
+    """
+    RunSQL that only runs on SQLite, the only database with the FTS5 index.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "sqlite":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "sqlite":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("task", "0006_task_comment_indexes"),
+    ]
+
+    operations = [
+        RunSQLiteSQL(FTS_SQL, DROP_FTS_SQL),
+    ]
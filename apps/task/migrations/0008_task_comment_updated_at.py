@@ -0,0 +1,73 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+# Recreates the search index triggers, frozen at this migration's schema.
+FTS_TRIGGERS_SQL = [
+    "DROP TRIGGER IF EXISTS task_task_fts_ai",
+    "DROP TRIGGER IF EXISTS task_task_fts_ad",
+    "DROP TRIGGER IF EXISTS task_task_fts_au",
+    """
+    CREATE TRIGGER task_task_fts_ai AFTER INSERT ON task_task BEGIN
+        INSERT INTO task_task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_task_fts_ad AFTER DELETE ON task_task BEGIN
+        INSERT INTO task_task_fts(task_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_task_fts_au AFTER UPDATE OF title, description ON task_task
+    BEGIN
+        INSERT INTO task_task_fts(task_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO task_task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO task_task_fts(task_task_fts) VALUES ('rebuild')",
+]
+
+
+class RunSQLiteSQL(migrations.RunSQL):
+    """
+    RunSQL that only runs on SQLite, the only database with the FTS5 index.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "sqlite":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "sqlite":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("task", "0007_task_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        # Adding the column rebuilds task_task on SQLite, which drops the search
+        # index triggers.
+        RunSQLiteSQL(FTS_TRIGGERS_SQL, migrations.RunSQL.noop),
+    ]
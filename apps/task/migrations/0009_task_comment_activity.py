@@ -0,0 +1,68 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:21
+
+from django.db import migrations, models
+
+# Recreates the search index triggers, frozen at this migration's schema.
+FTS_TRIGGERS_SQL = [
+    "DROP TRIGGER IF EXISTS task_task_fts_ai",
+    "DROP TRIGGER IF EXISTS task_task_fts_ad",
+    "DROP TRIGGER IF EXISTS task_task_fts_au",
+    """
+    CREATE TRIGGER task_task_fts_ai AFTER INSERT ON task_task BEGIN
+        INSERT INTO task_task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_task_fts_ad AFTER DELETE ON task_task BEGIN
+        INSERT INTO task_task_fts(task_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_task_fts_au AFTER UPDATE OF title, description ON task_task
+    BEGIN
+        INSERT INTO task_task_fts(task_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO task_task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO task_task_fts(task_task_fts) VALUES ('rebuild')",
+]
+
+
+class RunSQLiteSQL(migrations.RunSQL):
+    """
+    RunSQL that only runs on SQLite, the only database with the FTS5 index.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "sqlite":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "sqlite":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("task", "0008_task_comment_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="last_commented_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # Adding the column rebuilds task_task on SQLite, which drops the search
+        # index triggers.
+        RunSQLiteSQL(FTS_TRIGGERS_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:42
+
+from itertools import islice
+
+from django.db import migrations, models
+
+
+def record_existing_tasks(apps, schema_editor):
+    # Existing tasks enter the feed once, so syncing from 0 returns every task.
+    Task = apps.get_model("task", "Task")
+    TaskChange = apps.get_model("task", "TaskChange")
+    task_ids = Task.objects.order_by("id").values_list("id", flat=True).iterator()
+    while chunk := list(islice(task_ids, 1000)):
+        TaskChange.objects.bulk_create(TaskChange(task_id=task_id) for task_id in chunk)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("task", "0009_task_comment_activity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_id", models.BigIntegerField()),
+                ("changed_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(record_existing_tasks, migrations.RunPython.noop),
+    ]
@@ -19,9 +19,74 @@ class Task(models.Model):
     )
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tasks")
     is_completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized from Comment, see apps.task.activity.
+    comment_count = models.PositiveIntegerField(default=0)
+    last_commented_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "status", "id"], name="task_user_status_idx"),
+            models.Index(fields=["status", "id"], name="task_status_idx"),
+            models.Index(fields=["is_completed", "status"], name="task_completed_idx"),
+        ]
 
 
 class Comment(models.Model):
     text = models.TextField()
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["task", "id"], name="comment_task_idx"),
+        ]
+
+
+class TaskChange(models.Model):
+    # The primary key is the change sequence clients sync from. task_id is not a
+    # foreign key, so the changes of deleted tasks stay behind as tombstones.
+    task_id = models.BigIntegerField()
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+
+class ArchivedTask(models.Model):
+    # Finished tasks moved out of Task by apps.task.archive. They keep their ids,
+    # which Task never hands out again.
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    status = models.CharField(max_length=20, choices=Task.Status.choices)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_tasks"
+    )
+    is_completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField()
+    comment_count = models.PositiveIntegerField(default=0)
+    last_commented_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "status", "id"], name="archived_task_user_idx"
+            ),
+        ]
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    text = models.TextField()
+    task = models.ForeignKey(
+        ArchivedTask, on_delete=models.CASCADE, related_name="comments"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_comments"
+    )
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["task", "id"], name="archived_comment_task_idx"),
+        ]
@@ -0,0 +1,60 @@
+import re
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils.module_loading import import_string
+
+TERM_RE = re.compile(r"\w+")
+
+# FTS5 index over task titles and descriptions, created by migration 0007 and
+# kept in sync by triggers on task_task. SQLite drops those triggers whenever a
+# migration rebuilds the table, so such migrations must recreate them.
+FTS_TABLE = "task_task_fts"
+TITLE_WEIGHT = 10.0
+
+
+class SearchBackend:
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        raise NotImplementedError
+
+
+class SimpleSearchBackend(SearchBackend):
+    """
+    Unindexed ``icontains`` matching of every term, usable on any database.
+    """
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        terms = TERM_RE.findall(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(description__icontains=term)
+            )
+        return queryset.order_by("-id")
+
+
+class SqliteFTSSearchBackend(SearchBackend):
+    """
+    Ranked search through the SQLite FTS5 index.
+
+    Every term is prefix matched and all terms must match. Results are ordered by
+    BM25 relevance with title matches weighted above description matches, newest
+    first on ties.
+    """
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        terms = TERM_RE.findall(query)
+        if not terms:
+            return queryset.none()
+        match = " ".join(f'"{term}"*' for term in terms)
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = task_task.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+            select={"rank": f"bm25({FTS_TABLE}, {TITLE_WEIGHT}, 1.0)"},
+        ).order_by("rank", "-id")
+
+
+def get_search_backend() -> SearchBackend:
+    return import_string(settings.TASK_SEARCH_BACKEND)()
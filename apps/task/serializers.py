@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from apps.task.models import Task
@@ -6,13 +7,147 @@ from apps.task.models import Task
 class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
-        fields = ("id", "title", "description", "status", "is_completed", "user_id")
-        read_only_fields = ("id", "status", "is_completed", "user_id")
+        fields = (
+            "id",
+            "title",
+            "description",
+            "status",
+            "is_completed",
+            "user_id",
+            "comment_count",
+            "last_commented_at",
+        )
+        read_only_fields = (
+            "id",
+            "status",
+            "is_completed",
+            "user_id",
+            "comment_count",
+            "last_commented_at",
+        )
+
+
+class ImportUserSerializer(serializers.Serializer):
+    """
+    Resolves the owner of an imported row, given either as ``user_id`` or as
+    ``username``, against the preloaded ``user_ids`` and ``usernames`` (a
+    username to id map) in the context.
+    """
+
+    user_id = serializers.IntegerField(required=False)
+    username = serializers.CharField(required=False, write_only=True)
+
+    def validate(self, attrs):
+        if "username" in attrs:
+            username = attrs.pop("username")
+            if username not in self.context["usernames"]:
+                raise serializers.ValidationError({"username": ["Unknown user."]})
+            attrs["user_id"] = self.context["usernames"][username]
+        elif "user_id" not in attrs:
+            raise serializers.ValidationError(
+                {"user_id": ["Either user_id or username is required."]}
+            )
+        elif attrs["user_id"] not in self.context["user_ids"]:
+            raise serializers.ValidationError({"user_id": ["Unknown user."]})
+        return attrs
+
+
+class TaskImportSerializer(ImportUserSerializer, TaskSerializer):
+    """
+    TaskSerializer for imports, where the id, status and owner are data too.
+    """
+
+    id = serializers.IntegerField(required=False, min_value=1)
+    status = serializers.ChoiceField(
+        choices=Task.Status.choices, default=Task.Status.OPEN
+    )
+    is_completed = serializers.BooleanField(default=False)
+
+    class Meta(TaskSerializer.Meta):
+        fields = (
+            "id",
+            "title",
+            "description",
+            "status",
+            "is_completed",
+            "user_id",
+            "username",
+        )
+        read_only_fields = ()
 
 
 class AssignTaskSerializer(serializers.Serializer):
     user_id = serializers.IntegerField()
 
 
+class BulkTaskIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=settings.TASK_BULK_MAX_ITEMS,
+    )
+
+
+class BulkAssignTaskSerializer(BulkTaskIdsSerializer):
+    user_id = serializers.IntegerField()
+
+
+class BulkResultSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField())
+    errors = serializers.ListField(child=serializers.DictField())
+
+
+class UserTaskCountSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    count = serializers.IntegerField()
+
+
+class TaskStatsSerializer(serializers.Serializer):
+    total = serializers.IntegerField()
+    by_status = serializers.DictField(child=serializers.IntegerField())
+    by_user = UserTaskCountSerializer(many=True)
+    by_completed = serializers.DictField(child=serializers.IntegerField())
+
+
+class TaskChangeSerializer(serializers.Serializer):
+    seq = serializers.IntegerField()
+    id = serializers.IntegerField()
+    deleted = serializers.BooleanField()
+    archived = serializers.BooleanField(
+        help_text="The task was archived, task holds its archived data."
+    )
+    task = TaskSerializer(allow_null=True)
+
+
+class TaskChangesSerializer(serializers.Serializer):
+    results = TaskChangeSerializer(many=True)
+    since = serializers.IntegerField(help_text="Pass as since to the next request.")
+    has_more = serializers.BooleanField()
+
+
+class TaskChangesQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, default=0)
+    page_size = serializers.IntegerField(
+        min_value=1, max_value=settings.TASK_CHANGES_PAGE_SIZE, required=False
+    )
+
+
+class TaskEventsQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, required=False)
+    tasks = serializers.ListField(
+        child=serializers.IntegerField(), max_length=100, required=False
+    )
+    user_id = serializers.IntegerField(required=False)
+    wait = serializers.IntegerField(
+        min_value=0,
+        max_value=settings.TASK_EVENTS_LONG_POLL_TIMEOUT,
+        default=settings.TASK_EVENTS_LONG_POLL_TIMEOUT,
+    )
+
+
 class CommentSerializer(serializers.Serializer):
     text = serializers.CharField()
+
+
+class CommentImportSerializer(ImportUserSerializer, CommentSerializer):
+    task_id = serializers.IntegerField()
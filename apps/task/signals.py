@@ -0,0 +1,46 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.task.activity import record_comment, refresh_comment_activity
+from apps.task.cache import invalidate_tasks
+from apps.task.changes import record_changes
+from apps.task.models import Comment, Task
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_cache(sender, instance: Task, **kwargs) -> None:
+    invalidate_tasks([instance.pk])
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def record_task_change(sender, instance: Task, **kwargs) -> None:
+    record_changes([instance.pk], [instance.user_id])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_task_cache(sender, instance: Comment, **kwargs) -> None:
+    invalidate_tasks([instance.task_id])
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_activity(sender, instance: Comment, created: bool, **kwargs) -> None:
+    if created:
+        record_comment(instance)
+    else:
+        record_changes([instance.task_id])
+
+
+@receiver(post_delete, sender=Comment)
+def refresh_deleted_comment_activity(
+    sender, instance: Comment, origin, **kwargs
+) -> None:
+    # Comments cascading from a deleted task leave nothing to update.
+    deleting_tasks = isinstance(origin, Task) or (
+        isinstance(origin, QuerySet) and origin.model is Task
+    )
+    if not deleting_tasks:
+        refresh_comment_activity([instance.task_id])
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from apps.task.models import Task
+
+STATS_CACHE_KEY = "task:stats"
+
+
+def compute_task_stats() -> dict:
+    """
+    Task counts grouped by status, by user and by completion flag.
+
+    Each grouping is one ``GROUP BY`` over an index leading with the grouped
+    column, so no table rows are read.
+    """
+
+    def grouped(field: str):
+        return (
+            Task.objects.order_by()
+            .values(field)
+            .annotate(count=Count("id"))
+            .values_list(field, "count")
+        )
+
+    by_status = dict.fromkeys(Task.Status.values, 0)
+    by_status.update(grouped("status"))
+    by_completed = {"true": 0, "false": 0}
+    for is_completed, count in grouped("is_completed"):
+        by_completed["true" if is_completed else "false"] = count
+    by_user = [
+        {"user_id": user_id, "count": count}
+        for user_id, count in grouped("user_id").order_by("user_id")
+    ]
+
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_user": by_user,
+        "by_completed": by_completed,
+    }
+
+
+def get_task_stats() -> dict:
+    """
+    ``compute_task_stats`` reused for ``TASK_STATS_CACHE_TIMEOUT`` seconds.
+    """
+    if not settings.TASK_STATS_CACHE_TIMEOUT:
+        return compute_task_stats()
+    return cache.get_or_set(
+        STATS_CACHE_KEY, compute_task_stats, settings.TASK_STATS_CACHE_TIMEOUT
+    )
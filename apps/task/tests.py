@@ -1 +1,1833 @@
-# Create your tests here.
+import asyncio
+import csv
+import json
+import tempfile
+import tracemalloc
+from contextlib import asynccontextmanager, suppress
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.common.events import get_broker
+from apps.common.pagination import RankedPagination
+from apps.common.renderers import FastJSONRenderer, orjson
+from apps.notifications.models import Notification
+from apps.task.activity import refresh_comment_activity
+from apps.task.archive import archivable_tasks, archive_tasks
+from apps.task.cache import CACHE_STATS
+from apps.task.models import ArchivedTask, Comment, Task, TaskChange
+from apps.task.serializers import TaskSerializer
+from apps.task.views import task_changes
+
+
+class TestTaskNotifications(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        # check data in fixture json file
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.test_user2 = User.objects.create(
+            username="user2@email.com", email="user2@email.com"
+        )
+        self.client.force_authenticate(user=self.test_user1)
+        self.task = Task.objects.create(
+            title="Task", description="Description", user=self.test_user1
+        )
+
+    def test_assign_enqueues_notification(self) -> None:
+        response = self.client.post(
+            reverse("tasks-assign", kwargs={"id": self.task.id}),
+            {"user_id": self.test_user2.id},
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(mail.outbox), 0)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.recipient, "user2@email.com")
+        self.assertEqual(notification.subject, "New Task")
+
+    def test_assign_to_user_without_email_skips_notification(self) -> None:
+        user = User.objects.create(username="no-email")
+
+        response = self.client.post(
+            reverse("tasks-assign", kwargs={"id": self.task.id}), {"user_id": user.id}
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(Task.objects.get(id=self.task.id).user, user)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_comment_enqueues_notification(self) -> None:
+        response = self.client.post(
+            reverse("tasks-comment", kwargs={"id": self.task.id}), {"text": "Hello"}
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.recipient, "user1@email.com")
+        self.assertEqual(notification.message, "Hello")
+
+    def test_complete_enqueues_one_notification_per_commenter(self) -> None:
+        for user in (self.test_user1, self.test_user2, self.test_user2):
+            Comment.objects.create(text="Comment", task=self.task, user=user)
+
+        response = self.client.post(
+            reverse("tasks-complete", kwargs={"id": self.task.id})
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            sorted(Notification.objects.values_list("recipient", flat=True)),
+            ["user1@email.com", "user2@email.com"],
+        )
+
+    def test_complete_query_count_does_not_grow_with_commenters(self) -> None:
+        def complete_with_commenters(count: int) -> int:
+            task = Task.objects.create(
+                title="Task", description="Description", user=self.test_user1
+            )
+            users = User.objects.bulk_create(
+                User(username=f"{task.id}-{i}", email=f"{task.id}-{i}@email.com")
+                for i in range(count)
+            )
+            Comment.objects.bulk_create(
+                Comment(text="Comment", task=task, user=user) for user in users
+            )
+            with CaptureQueriesContext(connection) as context:
+                self.client.post(reverse("tasks-complete", kwargs={"id": task.id}))
+            return len(context.captured_queries)
+
+        self.assertEqual(complete_with_commenters(3), complete_with_commenters(30))
+        self.assertEqual(Notification.objects.count(), 33)
+
+
+class TestTaskPagination(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.client.force_authenticate(user=self.test_user1)
+        statuses = [choice[0] for choice in Task.Status.choices]
+        Task.objects.bulk_create(
+            Task(
+                title=f"Task {i}",
+                description="Description",
+                status=statuses[i % len(statuses)],
+                user=self.test_user1,
+            )
+            for i in range(5000)
+        )
+
+    def walk_pages(self, url: str, pages: int) -> list[list[str]]:
+        queries = []
+        for _ in range(pages):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            queries.append([query["sql"] for query in context.captured_queries])
+            url = response.data["next"]
+        return queries
+
+    def test_deep_pages_cost_the_same_as_the_first(self) -> None:
+        pages = self.walk_pages(reverse("tasks") + "?page_size=500", 10)
+
+        self.assertTrue(all(len(queries) == 1 for queries in pages))
+        self.assertNotIn("OFFSET", pages[-1][0])
+        self.assertIn("LIMIT 501", pages[-1][0])
+
+    def test_filtered_pages_are_keyset_paginated(self) -> None:
+        url = reverse("tasks") + f"?status=OPEN&user_id={self.test_user1.id}"
+        pages = self.walk_pages(url, 5)
+
+        self.assertTrue(all(len(queries) == 1 for queries in pages))
+        self.assertNotIn("OFFSET", pages[-1][0])
+
+    def test_pages_do_not_overlap(self) -> None:
+        first = self.client.get(reverse("tasks"))
+        second = self.client.get(first.data["next"])
+
+        first_ids = [task["id"] for task in first.data["results"]]
+        second_ids = [task["id"] for task in second.data["results"]]
+        self.assertEqual(len(first_ids), 50)
+        self.assertLess(max(first_ids), min(second_ids))
+
+    def test_page_size_is_capped(self) -> None:
+        response = self.client.get(reverse("tasks") + "?page_size=100000")
+
+        self.assertEqual(len(response.data["results"]), 500)
+
+
+class TestTaskQueryPlans(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.client.force_authenticate(user=self.test_user1)
+        self.task = Task.objects.create(
+            title="Task", description="Description", user=self.test_user1
+        )
+        Comment.objects.create(text="Comment", task=self.task, user=self.test_user1)
+
+    def query_plan(self, url: str) -> str:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        sql = context.captured_queries[-1]["sql"]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return "\n".join(row[-1] for row in cursor.fetchall())
+
+    def assert_uses_index(self, plan: str, index: str) -> None:
+        self.assertIn(f"INDEX {index}", plan)
+        self.assertNotIn("USE TEMP B-TREE", plan)
+
+    def test_status_filter_uses_index(self) -> None:
+        plan = self.query_plan(reverse("tasks") + "?status=OPEN")
+
+        self.assert_uses_index(plan, "task_status_idx")
+
+    def test_user_and_status_filter_uses_index(self) -> None:
+        url = reverse("tasks") + f"?status=OPEN&user_id={self.test_user1.id}"
+        plan = self.query_plan(url)
+
+        self.assert_uses_index(plan, "task_user_status_idx")
+
+    def test_comment_list_uses_index(self) -> None:
+        plan = self.query_plan(reverse("tasks-comments", kwargs={"id": self.task.id}))
+
+        self.assertIn("task_comment", plan)
+        self.assertNotIn("SCAN task_comment", plan)
+        self.assertNotIn("USE TEMP B-TREE", plan)
+
+
+class TestTaskSearch(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.client.force_authenticate(user=self.test_user1)
+        self.deploy = Task.objects.create(
+            title="Deploy release",
+            description="Roll out the new release to production",
+            user=self.test_user1,
+        )
+        self.docs = Task.objects.create(
+            title="Write docs",
+            description="Document the deployment procedure",
+            user=self.test_user1,
+        )
+        self.lunch = Task.objects.create(
+            title="Lunch", description="Order pizza", user=self.test_user1
+        )
+
+    def search(self, query: str, **params) -> list[int]:
+        response = self.client.get(reverse("tasks-search"), {"query": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [task["id"] for task in response.data["results"]]
+
+    def test_matches_title_and_description(self) -> None:
+        self.assertEqual(self.search("pizza"), [self.lunch.id])
+        self.assertEqual(self.search("release"), [self.deploy.id])
+
+    def test_prefix_matching_and_ranking(self) -> None:
+        # "deploy" is in the title of the first task, only in the description of
+        # the second one.
+        self.assertEqual(self.search("depl"), [self.deploy.id, self.docs.id])
+
+    def test_all_terms_must_match(self) -> None:
+        self.assertEqual(self.search("deploy production"), [self.deploy.id])
+
+    def test_empty_query_returns_nothing(self) -> None:
+        self.assertEqual(self.search(""), [])
+        self.assertEqual(self.search('"*'), [])
+
+    def test_index_follows_updates_and_deletes(self) -> None:
+        self.lunch.title = "Dinner"
+        self.lunch.save()
+        self.docs.delete()
+
+        self.assertEqual(self.search("dinner"), [self.lunch.id])
+        self.assertEqual(self.search("lunch"), [])
+        self.assertEqual(self.search("docs"), [])
+
+    def test_results_are_paginated(self) -> None:
+        Task.objects.bulk_create(
+            Task(title=f"Report {i}", description="", user=self.test_user1)
+            for i in range(5)
+        )
+
+        response = self.client.get(
+            reverse("tasks-search"), {"query": "report", "limit": 2}
+        )
+        last_page = self.client.get(
+            reverse("tasks-search"), {"query": "report", "limit": 2, "offset": 4}
+        )
+
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIn("offset=2", response.data["next"])
+        self.assertEqual(len(last_page.data["results"]), 1)
+        self.assertIsNone(last_page.data["next"])
+
+    @patch.object(RankedPagination, "max_offset", 2)
+    def test_offset_is_capped(self) -> None:
+        Task.objects.bulk_create(
+            Task(title=f"Report {i}", description="", user=self.test_user1)
+            for i in range(5)
+        )
+        url = reverse("tasks-search")
+
+        at_cap = self.client.get(url, {"query": "report", "limit": 2, "offset": 2})
+        past_cap = self.client.get(url, {"query": "report", "limit": 2, "offset": 3})
+
+        self.assertEqual(len(at_cap.data["results"]), 2)
+        self.assertIsNone(at_cap.data["next"])
+        self.assertEqual(past_cap.status_code, 400)
+        self.assertIn("offset", past_cap.data)
+
+    @override_settings(TASK_SEARCH_BACKEND="apps.task.search.SimpleSearchBackend")
+    def test_simple_backend(self) -> None:
+        self.assertEqual(self.search("deploy"), [self.docs.id, self.deploy.id])
+
+
+class TestBulkTasks(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.test_user2 = User.objects.create(
+            username="user2@email.com", email="user2@email.com"
+        )
+        self.client.force_authenticate(user=self.test_user1)
+        self.tasks = Task.objects.bulk_create(
+            Task(title=f"Task {i}", description="Description", user=self.test_user1)
+            for i in range(3)
+        )
+        self.ids = [task.id for task in self.tasks]
+
+    @override_settings(TASK_BULK_CHUNK_SIZE=2)
+    def test_bulk_create_reports_invalid_items(self) -> None:
+        response = self.client.post(
+            reverse("tasks-bulk"),
+            [
+                {"title": "First", "description": "One"},
+                {"description": "Missing title"},
+                {"title": "Second", "description": "Two"},
+                {"title": "Third", "description": "Three"},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["ids"]), 3)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+        self.assertIn("title", response.data["errors"][0]["errors"])
+        created = Task.objects.filter(id__in=response.data["ids"])
+        self.assertEqual(
+            sorted(created.values_list("title", flat=True)),
+            ["First", "Second", "Third"],
+        )
+        self.assertFalse(created.exclude(user=self.test_user1).exists())
+
+    def test_bulk_create_rejects_non_list(self) -> None:
+        response = self.client.post(
+            reverse("tasks-bulk"), {"title": "Task"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_complete_uses_one_update(self) -> None:
+        for task in self.tasks[:2]:
+            Comment.objects.create(text="Comment", task=task, user=self.test_user2)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                reverse("tasks-bulk-complete"),
+                {"ids": [*self.ids, 999999]},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["ids"], self.ids)
+        self.assertEqual(
+            response.data["errors"], [{"id": 999999, "errors": ["Not found."]}]
+        )
+        updates = [q for q in context.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(Task.objects.exclude(status=Task.Status.COMPLETED).exists())
+        notification = Notification.objects.get()
+        self.assertEqual(notification.recipient, "user2@email.com")
+        self.assertIn(f"{self.ids[0]}, {self.ids[1]}", notification.message)
+
+    def test_bulk_assign_notifies_once(self) -> None:
+        response = self.client.post(
+            reverse("tasks-bulk-assign"),
+            {"ids": self.ids, "user_id": self.test_user2.id},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["errors"], [])
+        self.assertEqual(
+            Task.objects.filter(user=self.test_user2).count(), len(self.ids)
+        )
+        notification = Notification.objects.get()
+        self.assertEqual(notification.recipient, "user2@email.com")
+
+    def test_bulk_assign_unknown_user(self) -> None:
+        response = self.client.post(
+            reverse("tasks-bulk-assign"),
+            {"ids": self.ids, "user_id": 999999},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TestTaskCache(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.test_user2 = User.objects.create(
+            username="user2@email.com", email="user2@email.com"
+        )
+        self.client.force_authenticate(user=self.test_user1)
+        self.task = Task.objects.create(
+            title="Task", description="Description", user=self.test_user1
+        )
+        self.detail_url = reverse("tasks-get-by-id", kwargs={"id": self.task.id})
+        self.comments_url = reverse("tasks-comments", kwargs={"id": self.task.id})
+
+    def test_detail_is_served_from_cache(self) -> None:
+        self.client.get(self.detail_url)
+        hits = CACHE_STATS["hits"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url)
+
+        self.assertEqual(response.data["title"], "Task")
+        self.assertEqual(CACHE_STATS["hits"], hits + 1)
+
+    def test_comments_are_served_from_cache(self) -> None:
+        Comment.objects.create(text="First", task=self.task, user=self.test_user1)
+        self.client.get(self.comments_url)
+        misses = CACHE_STATS["misses"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.comments_url)
+
+        self.assertEqual(response.data["results"], [{"text": "First"}])
+        self.assertEqual(CACHE_STATS["misses"], misses)
+
+    def test_missing_task_is_not_cached(self) -> None:
+        url = reverse("tasks-get-by-id", kwargs={"id": 999999})
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+        Task.objects.create(
+            id=999999, title="Late", description="", user=self.test_user1
+        )
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_writes_invalidate_detail(self) -> None:
+        self.client.get(self.detail_url)
+
+        self.client.post(
+            reverse("tasks-assign", kwargs={"id": self.task.id}),
+            {"user_id": self.test_user2.id},
+        )
+        self.assertEqual(
+            self.client.get(self.detail_url).data["user_id"], self.test_user2.id
+        )
+
+        self.client.post(reverse("tasks-complete", kwargs={"id": self.task.id}))
+        self.assertEqual(
+            self.client.get(self.detail_url).data["status"], Task.Status.COMPLETED
+        )
+
+        self.client.post(
+            reverse("tasks-bulk-assign"),
+            {"ids": [self.task.id], "user_id": self.test_user1.id},
+            format="json",
+        )
+        self.assertEqual(
+            self.client.get(self.detail_url).data["user_id"], self.test_user1.id
+        )
+
+        self.task.delete()
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+
+    def test_bulk_complete_invalidates_detail(self) -> None:
+        self.client.get(self.detail_url)
+
+        self.client.post(
+            reverse("tasks-bulk-complete"), {"ids": [self.task.id]}, format="json"
+        )
+
+        self.assertEqual(
+            self.client.get(self.detail_url).data["status"], Task.Status.COMPLETED
+        )
+
+    def test_new_comment_invalidates_comment_list(self) -> None:
+        self.assertEqual(self.client.get(self.comments_url).data["results"], [])
+
+        self.client.post(
+            reverse("tasks-comment", kwargs={"id": self.task.id}), {"text": "New"}
+        )
+
+        self.assertEqual(
+            self.client.get(self.comments_url).data["results"], [{"text": "New"}]
+        )
+
+    def test_invalidation_is_repeated_on_commit(self) -> None:
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.task.title = "Renamed"
+            self.task.save()
+            # Other connections reading before the commit would still see the old
+            # row and cache it under the version created here.
+            self.client.get(self.detail_url)
+
+        # The second callback announces the change to event streams.
+        self.assertEqual(len(callbacks), 2)
+        version = cache.get(f"task:{self.task.id}:version")
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(cache.get(f"task:{self.task.id}:version"), version)
+
+
+class TestConditionalGet(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.client.force_authenticate(user=self.test_user1)
+        self.task = Task.objects.create(
+            title="Task", description="Description", user=self.test_user1
+        )
+        Comment.objects.create(text="Comment", task=self.task, user=self.test_user1)
+        self.detail_url = reverse("tasks-get-by-id", kwargs={"id": self.task.id})
+        self.comments_url = reverse("tasks-comments", kwargs={"id": self.task.id})
+
+    def test_detail_etag_is_checked_without_queries(self) -> None:
+        response = self.client.get(self.detail_url)
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.detail_url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_detail_etag_changes_on_write(self) -> None:
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        self.task.title = "Renamed"
+        self.task.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["title"], "Renamed")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail_if_modified_since(self) -> None:
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+
+        response = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_comments_etag(self) -> None:
+        etag = self.client.get(self.comments_url)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.comments_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Comment.objects.create(text="Another", task=self.task, user=self.test_user1)
+        response = self.client.get(self.comments_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_list_etag_skips_serialization(self) -> None:
+        url = reverse("tasks")
+        etag = self.client.get(url)["ETag"]
+
+        with patch.object(TaskSerializer, "to_representation") as to_representation:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        to_representation.assert_not_called()
+
+    def test_list_etag_changes_on_bulk_update(self) -> None:
+        url = reverse("tasks")
+        etag = self.client.get(url)["ETag"]
+
+        self.client.post(
+            reverse("tasks-bulk-complete"), {"ids": [self.task.id]}, format="json"
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["status"], "COMPLETED")
+
+    def test_list_etag_changes_when_a_page_grows(self) -> None:
+        url = reverse("tasks") + "?page_size=1"
+        etag = self.client.get(url)["ETag"]
+
+        Task.objects.create(title="New", description="", user=self.test_user1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_collections_ignore_if_modified_since_after_delete(self) -> None:
+        Comment.objects.create(text="Another", task=self.task, user=self.test_user1)
+        other = Task.objects.create(title="Other", description="", user=self.test_user1)
+        since = "Fri, 01 Jan 2100 00:00:00 GMT"
+
+        for url, row in [
+            (reverse("tasks"), other),
+            (self.comments_url, Comment.objects.get(text="Another")),
+        ]:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertNotIn("Last-Modified", response)
+                count = len(response.data["results"])
+
+                row.delete()
+                response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn("Last-Modified", response)
+                self.assertEqual(len(response.data["results"]), count - 1)
+
+
+class TestQueryBudgets(TestCase):
+    """
+    Query count budget of every task endpoint. Raise a budget only together with a
+    reason, a growing query count is usually an N+1 or a redundant lookup.
+    """
+
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.test_user2 = User.objects.create(
+            username="user2@email.com", email="user2@email.com"
+        )
+        self.client.force_authenticate(user=self.test_user1)
+        self.task = Task.objects.create(
+            title="Task", description="Description", user=self.test_user1
+        )
+        for user in (self.test_user1, self.test_user2):
+            Comment.objects.create(text="Comment", task=self.task, user=user)
+
+    def test_list(self) -> None:
+        with self.assertNumQueries(1):
+            self.client.get(reverse("tasks") + "?status=OPEN")
+
+    def test_create(self) -> None:
+        # SAVEPOINT, task INSERT, change INSERT, RELEASE.
+        with self.assertNumQueries(4):
+            self.client.post(reverse("tasks"), {"title": "New", "description": "New"})
+
+    def test_bulk_create(self) -> None:
+        tasks = [{"title": f"New {i}", "description": "New"} for i in range(20)]
+
+        # SAVEPOINT, task INSERT, change INSERT, RELEASE.
+        with self.assertNumQueries(4):
+            self.client.post(reverse("tasks-bulk"), tasks, format="json")
+
+    def test_bulk_complete(self) -> None:
+        # SAVEPOINT, id lookup, UPDATE, change INSERT, commenter lookup,
+        # notification INSERT, RELEASE SAVEPOINT.
+        with self.assertNumQueries(7):
+            self.client.post(
+                reverse("tasks-bulk-complete"), {"ids": [self.task.id]}, format="json"
+            )
+
+    def test_bulk_assign(self) -> None:
+        # User lookup, SAVEPOINT, id lookup, UPDATE, change INSERT, notification
+        # INSERT, RELEASE.
+        with self.assertNumQueries(7):
+            self.client.post(
+                reverse("tasks-bulk-assign"),
+                {"ids": [self.task.id], "user_id": self.test_user2.id},
+                format="json",
+            )
+
+    def test_detail(self) -> None:
+        url = reverse("tasks-get-by-id", kwargs={"id": self.task.id})
+
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_delete(self) -> None:
+        # Task lookup, comment lookup for the delete signals, comment DELETE, task
+        # DELETE, tombstone INSERT.
+        with self.assertNumQueries(5):
+            response = self.client.delete(
+                reverse("tasks-get-by-id", kwargs={"id": self.task.id})
+            )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Task.objects.filter(pk=self.task.id).exists())
+
+    def test_assign(self) -> None:
+        # Task and user lookups, SAVEPOINT, UPDATE, change INSERT, notification
+        # INSERT, RELEASE.
+        with self.assertNumQueries(7):
+            self.client.post(
+                reverse("tasks-assign", kwargs={"id": self.task.id}),
+                {"user_id": self.test_user2.id},
+            )
+
+    def test_complete(self) -> None:
+        # Task lookup, SAVEPOINT, UPDATE, change INSERT, commenter lookup,
+        # notification INSERT, RELEASE.
+        with self.assertNumQueries(7):
+            self.client.post(reverse("tasks-complete", kwargs={"id": self.task.id}))
+
+    def test_comments(self) -> None:
+        url = reverse("tasks-comments", kwargs={"id": self.task.id})
+
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_comments_of_missing_task(self) -> None:
+        url = reverse("tasks-comments", kwargs={"id": 999999})
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_comment(self) -> None:
+        # Task with assignee email, SAVEPOINT, comment INSERT, comment activity
+        # UPDATE, change INSERT, notification INSERT, RELEASE.
+        with self.assertNumQueries(7):
+            self.client.post(
+                reverse("tasks-comment", kwargs={"id": self.task.id}), {"text": "Hi"}
+            )
+
+    def test_search(self) -> None:
+        with self.assertNumQueries(1):
+            self.client.get(reverse("tasks-search"), {"query": "task"})
+
+
+class TestTaskStats(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.test_user2 = User.objects.create(
+            username="user2@email.com", email="user2@email.com"
+        )
+        self.client.force_authenticate(user=self.test_user1)
+        Task.objects.bulk_create(
+            [
+                Task(title="Task", description="Task", user=self.test_user1),
+                Task(title="Task", description="Task", user=self.test_user1),
+                Task(
+                    title="Task",
+                    description="Task",
+                    user=self.test_user2,
+                    status=Task.Status.COMPLETED,
+                    is_completed=True,
+                ),
+            ]
+        )
+
+    def test_stats(self) -> None:
+        # One GROUP BY query per grouping.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("tasks-stats"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data,
+            {
+                "total": 3,
+                "by_status": {
+                    "OPEN": 2,
+                    "IN_PROGRESS": 0,
+                    "COMPLETED": 1,
+                    "CANCELED": 0,
+                    "ARCHIVED": 0,
+                },
+                "by_user": [
+                    {"user_id": self.test_user1.id, "count": 2},
+                    {"user_id": self.test_user2.id, "count": 1},
+                ],
+                "by_completed": {"true": 1, "false": 2},
+            },
+        )
+
+    def test_stats_are_cached(self) -> None:
+        self.client.get(reverse("tasks-stats"))
+        Task.objects.create(title="Task", description="Task", user=self.test_user1)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("tasks-stats"))
+        self.assertEqual(response.data["total"], 3)
+
+        with override_settings(TASK_STATS_CACHE_TIMEOUT=0):
+            response = self.client.get(reverse("tasks-stats"))
+        self.assertEqual(response.data["total"], 4)
+
+
+class TestTaskExport(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.test_user2 = User.objects.create(
+            username="user2@email.com", email="user2@email.com"
+        )
+        self.client.force_authenticate(user=self.test_user1)
+        self.task = Task.objects.create(
+            title="Task", description="Line, with comma", user=self.test_user1
+        )
+        Task.objects.create(
+            title="Other", description="Description", user=self.test_user2
+        )
+        Comment.objects.create(text="Comment", task=self.task, user=self.test_user2)
+
+    def export(self, url: str, **params) -> tuple:
+        response = self.client.get(url, params)
+        content = b"".join(response.streaming_content).decode()
+        return response, content
+
+    def test_ndjson_export_honours_filters(self) -> None:
+        response, content = self.export(
+            reverse("tasks-export"), user_id=self.test_user1.id
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        self.task.refresh_from_db()
+        self.assertEqual(
+            [json.loads(line) for line in content.splitlines()],
+            [json.loads(json.dumps(TaskSerializer(self.task).data))],
+        )
+
+    @override_settings(ROOT_URLCONF="config.urls_asgi", TASK_EXPORT_CHUNK_SIZE=1)
+    async def test_export_streams_under_asgi(self) -> None:
+        response = await self.async_client.get(
+            reverse("tasks-export"),
+            {"format": "csv"},
+            AUTHORIZATION=f"Bearer {AccessToken.for_user(self.test_user1)}",
+        )
+
+        # A synchronous iterator would be read into a list before sending.
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+        rows = list(csv.DictReader(StringIO(b"".join(chunks).decode())))
+        self.assertEqual([row["title"] for row in rows], ["Task", "Other"])
+
+    def test_csv_export(self) -> None:
+        response, content = self.export(reverse("tasks-export"), format="csv")
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="tasks.csv"', response["Content-Disposition"])
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([row["title"] for row in rows], ["Task", "Other"])
+        self.assertEqual(rows[0]["description"], "Line, with comma")
+
+    def test_comment_export(self) -> None:
+        _, content = self.export(
+            reverse("tasks-comments-export", kwargs={"id": self.task.id})
+        )
+
+        row = json.loads(content)
+        self.assertEqual(row["text"], "Comment")
+        self.assertEqual(row["user_id"], self.test_user2.id)
+
+        response = self.client.get(
+            reverse("tasks-comments-export", kwargs={"id": 999999})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_requires_authentication(self) -> None:
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(reverse("tasks-export"))
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("detail", json.loads(response.content))
+
+    @override_settings(TASK_EXPORT_CHUNK_SIZE=500)
+    def test_memory_stays_bounded(self) -> None:
+        description = "x" * 1000
+        Task.objects.bulk_create(
+            Task(title="Bulk", description=description, user=self.test_user1)
+            for _ in range(20_000)
+        )
+
+        tracemalloc.start()
+        try:
+            response = self.client.get(reverse("tasks-export"))
+            size = sum(len(chunk) for chunk in response.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # About 20 MB streamed, while only a couple of chunks are ever held.
+        self.assertGreater(size, 20_000_000)
+        self.assertLess(peak, 5_000_000)
+
+
+class TestImportTasks(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def import_file(self, name: str, content: str, *args) -> tuple[str, Path]:
+        path = Path(self.tmp.name) / name
+        path.write_text(content)
+        stdout = StringIO()
+        call_command("import_tasks", str(path), *args, stdout=stdout)
+        return stdout.getvalue(), Path(f"{path}.rejects.ndjson")
+
+    def test_import_ndjson_tasks(self) -> None:
+        existing = Task.objects.create(
+            title="Existing", description="Existing", user=self.test_user1
+        )
+        rows = [
+            {"title": "First", "description": "D", "username": "username1"},
+            {
+                "id": 5000,
+                "title": "Second",
+                "description": "D",
+                "status": "COMPLETED",
+                "user_id": self.test_user1.id,
+            },
+            {"title": "No description", "user_id": self.test_user1.id},
+            {"title": "Nobody", "description": "D", "username": "nobody"},
+            {"id": existing.id, "title": "Taken", "description": "D", "user_id": 1},
+        ]
+        content = "\n".join(json.dumps(row) for row in rows) + "\nnot json\n"
+
+        output, rejects_path = self.import_file(
+            "tasks.ndjson", content, "--chunk-size", "2"
+        )
+
+        self.assertIn("Imported 2 tasks", output)
+        self.assertEqual(Task.objects.get(title="Second").status, Task.Status.COMPLETED)
+        self.assertEqual(Task.objects.get(pk=5000).title, "Second")
+        self.assertEqual(Task.objects.get(title="First").user, self.test_user1)
+        rejects = {
+            reject["line"]: reject["errors"]
+            for reject in map(json.loads, rejects_path.read_text().splitlines())
+        }
+        self.assertEqual(
+            rejects,
+            {
+                3: {"description": ["This field is required."]},
+                4: {"username": ["Unknown user."]},
+                5: {"id": ["Task already exists."]},
+                6: {"non_field_errors": ["Bad row."]},
+            },
+        )
+
+    def test_import_csv_comments(self) -> None:
+        task = Task.objects.create(title="Task", description="D", user=self.test_user1)
+        content = (
+            "task_id,user_id,text\n"
+            f"{task.id},{self.test_user1.id},First\n"
+            f"{task.id},{self.test_user1.id},Second\n"
+            f"999999,{self.test_user1.id},Orphan\n"
+        )
+
+        output, rejects_path = self.import_file(
+            "comments.csv", content, "--kind", "comments"
+        )
+
+        self.assertIn("Imported 2 comments", output)
+        task.refresh_from_db()
+        self.assertEqual(task.comment_count, 2)
+        rejects = [json.loads(line) for line in rejects_path.read_text().splitlines()]
+        self.assertEqual(rejects[0]["errors"], {"task_id": ["Task not found."]})
+
+    def test_no_rejects_file_without_rejects(self) -> None:
+        content = json.dumps({"title": "T", "description": "D", "user_id": 1})
+
+        _, rejects_path = self.import_file("tasks.ndjson", content)
+
+        self.assertFalse(rejects_path.exists())
+
+
+@skipUnless(
+    orjson, "orjson is not installed, FastJSONRenderer falls back to JSONRenderer"
+)
+class TestFastSerialization(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.client.force_authenticate(user=self.test_user1)
+        self.task = Task.objects.create(
+            title='Tâsk \u2028 "quoted"',
+            description="Line\nbreak",
+            user=self.test_user1,
+        )
+        Task.objects.create(title="Task 😀", description="Plain", user=self.test_user1)
+        Comment.objects.create(text="Cömment\t", task=self.task, user=self.test_user1)
+
+    def assert_same_content(self, url: str, params: dict | None = None) -> list:
+        responses = []
+        for fast in (True, False):
+            cache.clear()
+            with override_settings(FAST_READ_SERIALIZATION=fast):
+                responses.append(self.client.get(url, params))
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(responses[0].content, responses[1].content)
+        # Both paths render with orjson; compare with the stock renderer too.
+        self.assertEqual(responses[0].content, JSONRenderer().render(responses[0].data))
+        return responses
+
+    def test_list(self) -> None:
+        fast, slow = self.assert_same_content(reverse("tasks"))
+
+        self.assertEqual(fast["ETag"], slow["ETag"])
+
+    def test_search(self) -> None:
+        self.assert_same_content(reverse("tasks-search"), {"query": "task"})
+
+    def test_comments(self) -> None:
+        self.assert_same_content(reverse("tasks-comments", kwargs={"id": self.task.id}))
+
+    def test_renderer_encodes_with_orjson(self) -> None:
+        data = {"title": "Tâsk \u2028", "ids": [1, 2]}
+
+        with patch.object(orjson, "dumps", wraps=orjson.dumps) as dumps:
+            content = FastJSONRenderer().render(data)
+
+        dumps.assert_called_once()
+        self.assertEqual(content, JSONRenderer().render(data))
+
+    def test_renderer_falls_back_for_keys_orjson_rejects(self) -> None:
+        data = {1: "one", "nested": [None, True]}
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class TestCommentActivity(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.client.force_authenticate(user=self.test_user1)
+        self.task = Task.objects.create(
+            title="Task", description="Description", user=self.test_user1
+        )
+
+    def test_posting_comments_updates_activity(self) -> None:
+        for text in ("First", "Second"):
+            self.client.post(
+                reverse("tasks-comment", kwargs={"id": self.task.id}), {"text": text}
+            )
+
+        response = self.client.get(
+            reverse("tasks-get-by-id", kwargs={"id": self.task.id})
+        )
+        last = Comment.objects.get(text="Second")
+        self.assertEqual(response.data["comment_count"], 2)
+        self.assertEqual(
+            response.data["last_commented_at"],
+            last.updated_at.isoformat().replace("+00:00", "Z"),
+        )
+
+    def test_deleting_comment_recomputes_activity(self) -> None:
+        first = Comment.objects.create(
+            text="First", task=self.task, user=self.test_user1
+        )
+        second = Comment.objects.create(
+            text="Second", task=self.task, user=self.test_user1
+        )
+
+        second.delete()
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.comment_count, 1)
+        self.assertEqual(self.task.last_commented_at, first.updated_at)
+
+        first.delete()
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.comment_count, 0)
+        self.assertIsNone(self.task.last_commented_at)
+
+    def test_backfill_command(self) -> None:
+        other = Task.objects.create(
+            title="Other", description="Description", user=self.test_user1
+        )
+        comments = Comment.objects.bulk_create(
+            Comment(text="Comment", task=self.task, user=self.test_user1)
+            for _ in range(3)
+        )
+
+        updated_at = {self.task.id: self.task.updated_at, other.id: other.updated_at}
+        changes = TaskChange.objects.count()
+        stdout = StringIO()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "backfill_comment_activity", "--chunk-size", "1", stdout=stdout
+            )
+
+        self.task.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.task.comment_count, 3)
+        self.assertEqual(
+            self.task.last_commented_at, max(c.updated_at for c in comments)
+        )
+        self.assertEqual(other.comment_count, 0)
+        self.assertEqual(stdout.getvalue().splitlines()[-1], "Corrected 1 task(s)")
+        # Corrections are not changes: archiving and the change feed ignore them.
+        self.assertEqual(
+            {self.task.id: self.task.updated_at, other.id: other.updated_at},
+            updated_at,
+        )
+        self.assertEqual(TaskChange.objects.count(), changes)
+
+    def test_refresh_skips_tasks_whose_activity_is_current(self) -> None:
+        Comment.objects.create(text="Comment", task=self.task, user=self.test_user1)
+        self.task.refresh_from_db()
+        changes = TaskChange.objects.count()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(refresh_comment_activity([self.task.id]), 0)
+
+        self.assertEqual(
+            Task.objects.get(id=self.task.id).updated_at, self.task.updated_at
+        )
+        self.assertEqual(TaskChange.objects.count(), changes)
+
+
+@override_settings(ROOT_URLCONF="config.urls_asgi")
+class TestAsyncTaskViews(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.test_user2 = User.objects.create(
+            username="user2@email.com", email="user2@email.com"
+        )
+        self.auth = f"Bearer {AccessToken.for_user(self.test_user1)}"
+        self.sync_client = APIClient()
+        self.sync_client.force_authenticate(user=self.test_user1)
+        self.tasks = Task.objects.bulk_create(
+            Task(title=f"Task {i}", description="Description", user=self.test_user1)
+            for i in range(5)
+        )
+        self.task = self.tasks[0]
+        Comment.objects.create(text="Comment", task=self.task, user=self.test_user2)
+
+    def sync_get(self, url: str):
+        with override_settings(ROOT_URLCONF="config.urls"):
+            return self.sync_client.get(url)
+
+    async def test_requires_authentication(self) -> None:
+        response = await self.async_client.get(reverse("tasks"))
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], 'Bearer realm="api"')
+
+    async def test_list_matches_sync_view(self) -> None:
+        url = reverse("tasks") + "?page_size=2"
+        pages = []
+        while url:
+            response = await self.async_client.get(url, AUTHORIZATION=self.auth)
+            self.assertEqual(response.status_code, 200)
+            sync_response = await sync_to_async(self.sync_get)(url)
+            self.assertEqual(response.content, sync_response.content)
+            self.assertEqual(response["ETag"], sync_response["ETag"])
+            pages.append([task["id"] for task in response.json()["results"]])
+            url = response.json()["next"]
+
+        self.assertEqual(
+            pages, [[t.id for t in self.tasks[i : i + 2]] for i in (0, 2, 4)]
+        )
+
+    async def test_detail_is_cached_with_etag(self) -> None:
+        url = reverse("tasks-get-by-id", kwargs={"id": self.task.id})
+        response = await self.async_client.get(url, AUTHORIZATION=self.auth)
+        self.assertEqual(response.json()["title"], "Task 0")
+
+        response = await self.async_client.get(
+            url, AUTHORIZATION=self.auth, IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = await self.async_client.get(
+            reverse("tasks-get-by-id", kwargs={"id": 0}), AUTHORIZATION=self.auth
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_comments(self) -> None:
+        response = await self.async_client.get(
+            reverse("tasks-comments", kwargs={"id": self.task.id}),
+            AUTHORIZATION=self.auth,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [comment["text"] for comment in response.json()["results"]], ["Comment"]
+        )
+
+    async def test_search(self) -> None:
+        response = await self.async_client.get(
+            reverse("tasks-search"),
+            {"query": "task", "limit": 2},
+            AUTHORIZATION=self.auth,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertIsNotNone(response.json()["next"])
+
+    async def test_complete_enqueues_notifications(self) -> None:
+        response = await self.async_client.post(
+            reverse("tasks-complete", kwargs={"id": self.task.id}),
+            AUTHORIZATION=self.auth,
+        )
+
+        self.assertEqual(response.status_code, 204)
+        task = await Task.objects.aget(pk=self.task.id)
+        self.assertEqual(task.status, Task.Status.COMPLETED)
+        notification = await Notification.objects.aget()
+        self.assertEqual(notification.recipient, "user2@email.com")
+
+    async def test_unhandled_methods_fall_back_to_sync_view(self) -> None:
+        response = await self.async_client.post(
+            reverse("tasks"),
+            {"title": "Created", "description": "Description"},
+            content_type="application/json",
+            AUTHORIZATION=self.auth,
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(await Task.objects.filter(title="Created").aexists())
+
+
+class TestTaskChanges(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.test_user2 = User.objects.create(
+            username="user2@email.com", email="user2@email.com"
+        )
+        self.client.force_authenticate(user=self.test_user1)
+        self.tasks = [
+            Task.objects.create(
+                title=f"Task {i}", description="Task", user=self.test_user1
+            )
+            for i in range(4)
+        ]
+        self.since = TaskChange.objects.latest("id").id
+
+    def changes(self, since: int, **params) -> dict:
+        response = self.client.get(reverse("tasks-changes"), {"since": since, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_initial_sync_returns_every_task(self) -> None:
+        data = self.changes(0)
+
+        self.assertEqual([c["id"] for c in data["results"]], [t.id for t in self.tasks])
+        self.assertEqual(data["results"][0]["task"], TaskSerializer(self.tasks[0]).data)
+        self.assertEqual(data["since"], self.since)
+        self.assertFalse(data["has_more"])
+
+    def test_no_changes(self) -> None:
+        data = self.changes(self.since)
+
+        self.assertEqual(data, {"results": [], "since": self.since, "has_more": False})
+
+    def test_write_paths_record_changes(self) -> None:
+        first, second, third, fourth = self.tasks
+        self.client.post(
+            reverse("tasks-assign", kwargs={"id": first.id}),
+            {"user_id": self.test_user2.id},
+        )
+        self.client.post(reverse("tasks-complete", kwargs={"id": second.id}))
+        self.client.post(
+            reverse("tasks-comment", kwargs={"id": third.id}), {"text": "Comment"}
+        )
+        self.client.post(
+            reverse("tasks-bulk-complete"), {"ids": [fourth.id]}, format="json"
+        )
+        created = self.client.post(
+            reverse("tasks-bulk"),
+            [{"title": "New", "description": "New"}],
+            format="json",
+        ).data["ids"]
+
+        data = self.changes(self.since)
+
+        changed = {c["id"]: c["task"] for c in data["results"]}
+        self.assertEqual(
+            list(changed), [first.id, second.id, third.id, fourth.id, *created]
+        )
+        self.assertEqual(changed[first.id]["user_id"], self.test_user2.id)
+        self.assertEqual(changed[second.id]["status"], Task.Status.COMPLETED)
+        self.assertEqual(changed[third.id]["comment_count"], 1)
+        self.assertEqual(changed[fourth.id]["status"], Task.Status.COMPLETED)
+
+    def test_deleted_tasks_are_tombstones(self) -> None:
+        task = self.tasks[0]
+        self.client.delete(reverse("tasks-get-by-id", kwargs={"id": task.id}))
+
+        data = self.changes(self.since)
+
+        self.assertEqual(
+            data["results"],
+            [
+                {
+                    "seq": data["since"],
+                    "id": task.id,
+                    "deleted": True,
+                    "archived": False,
+                    "task": None,
+                }
+            ],
+        )
+
+    def test_tasks_are_ordered_by_their_latest_change(self) -> None:
+        first, second = self.tasks[:2]
+        first.save()
+        second.save()
+        first.save()
+
+        data = self.changes(self.since)
+
+        self.assertEqual([c["id"] for c in data["results"]], [second.id, first.id])
+        self.assertEqual(data["results"][-1]["seq"], data["since"])
+
+    def test_paging(self) -> None:
+        seen = []
+        since = 0
+        while True:
+            data = self.changes(since, page_size=3)
+            seen += [c["id"] for c in data["results"]]
+            since = data["since"]
+            if not data["has_more"]:
+                break
+
+        self.assertEqual(seen, [t.id for t in self.tasks])
+        self.assertEqual(since, self.since)
+
+    def test_model_path_matches_fast_path(self) -> None:
+        fast = self.client.get(reverse("tasks-changes"))
+        with override_settings(FAST_READ_SERIALIZATION=False):
+            model = self.client.get(reverse("tasks-changes"))
+
+        self.assertEqual(fast.content, model.content)
+
+    def test_invalid_since(self) -> None:
+        response = self.client.get(reverse("tasks-changes"), {"since": "x"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(ROOT_URLCONF="config.urls_asgi")
+class TestTaskEvents(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.test_user2 = User.objects.create(
+            username="user2@email.com", email="user2@email.com"
+        )
+        self.auth = f"Bearer {AccessToken.for_user(self.test_user1)}"
+        self.task = Task.objects.create(
+            title="Task", description="Task", user=self.test_user1
+        )
+        self.other = Task.objects.create(
+            title="Other", description="Other", user=self.test_user2
+        )
+
+    def write(self, func, *args, **kwargs) -> None:
+        # Broker messages are published on commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            func(*args, **kwargs)
+
+    def complete(self, task: Task) -> None:
+        task.status = Task.Status.COMPLETED
+        self.write(task.save)
+
+    @asynccontextmanager
+    async def open_stream(self, headers=None, **params):
+        response = await self.async_client.get(
+            reverse("tasks-events"), params, AUTHORIZATION=self.auth, headers=headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        try:
+            yield response.streaming_content
+        finally:
+            await response.streaming_content.aclose()
+
+    @staticmethod
+    def parse(chunk: str | bytes) -> dict:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+        return {**fields, "data": json.loads(fields["data"])}
+
+    async def test_requires_authentication(self) -> None:
+        response = await self.async_client.get(reverse("tasks-events"))
+
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_is_woken_by_subscribed_changes(self) -> None:
+        async with self.open_stream(tasks=[self.task.id]) as stream:
+            pending = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0.05)
+
+            await sync_to_async(self.complete)(self.other)
+            await asyncio.sleep(0.05)
+            self.assertFalse(pending.done())
+            await sync_to_async(self.complete)(self.task)
+
+            event = self.parse(await asyncio.wait_for(pending, 2))
+            self.assertEqual(event["event"], "task")
+            self.assertEqual(event["data"]["id"], self.task.id)
+            self.assertEqual(event["data"]["task"]["status"], Task.Status.COMPLETED)
+            self.assertEqual(event["id"], str(event["data"]["seq"]))
+
+    async def test_stream_subscribes_to_own_tasks_by_default(self) -> None:
+        async with self.open_stream() as stream:
+            await sync_to_async(self.complete)(self.other)
+            await sync_to_async(self.complete)(self.task)
+
+            self.assertEqual(
+                self.parse(await anext(stream))["data"]["id"], self.task.id
+            )
+
+    async def test_user_stream_is_not_woken_by_other_users(self) -> None:
+        with patch("apps.task.async_views.task_changes", wraps=task_changes) as reads:
+            async with self.open_stream() as stream:
+                pending = asyncio.ensure_future(anext(stream))
+                await asyncio.sleep(0.05)
+
+                await sync_to_async(self.complete)(self.other)
+                await asyncio.sleep(0.05)
+                self.assertEqual(reads.call_count, 1)
+                await sync_to_async(self.complete)(self.task)
+
+                event = self.parse(await asyncio.wait_for(pending, 2))
+                self.assertEqual(event["data"]["id"], self.task.id)
+                self.assertEqual(reads.call_count, 2)
+
+    async def test_stream_sends_tombstones_and_comments(self) -> None:
+        other_id = self.other.id
+        async with self.open_stream(tasks=[self.task.id, other_id]) as stream:
+            await sync_to_async(self.write)(
+                Comment.objects.create,
+                text="Comment",
+                task=self.task,
+                user=self.test_user2,
+            )
+            await sync_to_async(self.write)(self.other.delete)
+
+            commented = self.parse(await anext(stream))["data"]
+            deleted = self.parse(await anext(stream))["data"]
+            self.assertEqual(commented["task"]["comment_count"], 1)
+            self.assertEqual((deleted["id"], deleted["deleted"]), (other_id, True))
+
+    async def test_stream_resumes_after_last_event_id(self) -> None:
+        since = (await TaskChange.objects.alatest("id")).id
+        await sync_to_async(self.complete)(self.task)
+
+        async with self.open_stream(
+            headers={"Last-Event-ID": str(since)}, since=0
+        ) as stream:
+            event = self.parse(await anext(stream))
+
+        self.assertGreater(int(event["id"]), since)
+
+    @override_settings(TASK_EVENTS_HEARTBEAT=0.01)
+    async def test_idle_stream_sends_keep_alives(self) -> None:
+        async with self.open_stream() as stream:
+            self.assertEqual(await anext(stream), b": keep-alive\n\n")
+
+    async def test_stream_unsubscribes_when_closed(self) -> None:
+        async with self.open_stream() as stream:
+            pending = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(get_broker().hub.queues), 1)
+
+            # Django cancels the response when the client disconnects.
+            pending.cancel()
+            with suppress(asyncio.CancelledError):
+                await pending
+
+            self.assertEqual(len(get_broker().hub.queues), 0)
+
+    async def test_long_poll_returns_on_change(self) -> None:
+        pending = asyncio.ensure_future(
+            self.async_client.get(
+                reverse("tasks-events-poll"),
+                {"tasks": [self.task.id]},
+                AUTHORIZATION=self.auth,
+            )
+        )
+        await asyncio.sleep(0.05)
+        await sync_to_async(self.complete)(self.task)
+
+        response = await asyncio.wait_for(pending, 2)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([c["id"] for c in data["results"]], [self.task.id])
+        self.assertEqual(data["since"], data["results"][0]["seq"])
+
+    async def test_long_poll_times_out(self) -> None:
+        since = (await TaskChange.objects.alatest("id")).id
+        await sync_to_async(self.complete)(self.other)
+
+        response = await self.async_client.get(
+            reverse("tasks-events-poll"),
+            {"since": since, "wait": 0},
+            AUTHORIZATION=self.auth,
+        )
+
+        self.assertEqual(
+            response.json(), {"results": [], "since": since + 1, "has_more": False}
+        )
+
+
+class TestTaskArchive(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.client.force_authenticate(user=self.test_user1)
+        self.tasks = [
+            Task.objects.create(
+                title=f"Task {i}",
+                description="Task",
+                status=status,
+                user=self.test_user1,
+            )
+            for i, status in enumerate(
+                ["COMPLETED", "OPEN", "CANCELED", "COMPLETED", "OPEN"]
+            )
+        ]
+        Comment.objects.create(text="Comment", task=self.tasks[0], user=self.test_user1)
+        # The last task was finished recently.
+        Task.objects.filter(id__in=[t.id for t in self.tasks[:4]]).update(
+            updated_at=timezone.now() - timedelta(days=100)
+        )
+        self.old_completed, self.old_open, self.old_canceled, _, self.recent = (
+            Task.objects.order_by("id")
+        )
+
+    def archive(self, *args) -> str:
+        stdout = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("archive_tasks", "--chunk-size", "1", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_archives_old_finished_tasks_and_comments(self) -> None:
+        output = self.archive()
+
+        archived = [self.old_completed.id, self.old_canceled.id, self.tasks[3].id]
+        self.assertEqual(output.splitlines()[-1], "Archived 3 task(s)")
+        self.assertEqual(
+            list(ArchivedTask.objects.order_by("id").values_list("id", flat=True)),
+            archived,
+        )
+        self.assertFalse(Task.objects.filter(id__in=archived).exists())
+        self.assertFalse(Comment.objects.exists())
+
+        task = ArchivedTask.objects.get(id=self.old_completed.id)
+        self.assertEqual(task.updated_at, self.old_completed.updated_at)
+        self.assertEqual(task.comment_count, 1)
+        self.assertEqual(
+            list(task.comments.values_list("text", "user_id")),
+            [("Comment", self.test_user1.id)],
+        )
+
+    def test_archives_given_statuses(self) -> None:
+        self.archive("--status", "OPEN", "--days", "30")
+
+        self.assertEqual(
+            list(ArchivedTask.objects.values_list("id", flat=True)), [self.old_open.id]
+        )
+
+    def test_detail_reads_through_to_archive(self) -> None:
+        url = reverse("tasks-get-by-id", kwargs={"id": self.old_completed.id})
+        before = self.client.get(url).json()
+
+        self.archive()
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), before)
+        self.assertEqual(self.client.delete(url).status_code, 404)
+
+    def test_list_includes_archived_on_request(self) -> None:
+        self.archive()
+        ids = [task.id for task in self.tasks]
+
+        for fast in (True, False):
+            with self.subTest(fast=fast), self.settings(FAST_READ_SERIALIZATION=fast):
+                self.assertEqual(
+                    [
+                        t["id"]
+                        for t in self.client.get(reverse("tasks")).json()["results"]
+                    ],
+                    [self.old_open.id, self.recent.id],
+                )
+
+                seen = []
+                url = reverse("tasks") + "?include_archived=true&page_size=2"
+                while url:
+                    data = self.client.get(url).json()
+                    seen += [task["id"] for task in data["results"]]
+                    url = data["next"]
+                self.assertEqual(seen, ids)
+
+                data = self.client.get(
+                    reverse("tasks"), {"include_archived": "1", "status": "COMPLETED"}
+                ).json()
+                self.assertEqual([t["id"] for t in data["results"]], [ids[0], ids[3]])
+
+    def test_list_with_archived_pages_in_numeric_id_order(self) -> None:
+        # Ids of different lengths, archived and not, sort differently as text.
+        for task_id in range(99_997, 100_004):
+            Task.objects.create(
+                id=task_id,
+                title=f"Task {task_id}",
+                description="Task",
+                status="COMPLETED" if task_id % 2 else "OPEN",
+                user=self.test_user1,
+            )
+        Task.objects.filter(id__gte=99_997).update(
+            updated_at=timezone.now() - timedelta(days=100)
+        )
+        self.archive()
+        ids = sorted(
+            [*Task.objects.values_list("id", flat=True)]
+            + [*ArchivedTask.objects.values_list("id", flat=True)]
+        )
+        self.assertTrue(ArchivedTask.objects.filter(id=100_001).exists())
+
+        for fast in (True, False):
+            with self.subTest(fast=fast), self.settings(FAST_READ_SERIALIZATION=fast):
+                seen = []
+                url = reverse("tasks") + "?include_archived=true&page_size=3"
+                while url:
+                    data = self.client.get(url).json()
+                    seen += [task["id"] for task in data["results"]]
+                    url = data["next"]
+                self.assertEqual(seen, ids)
+
+    def test_archiving_a_chunk_records_its_changes_at_once(self) -> None:
+        before = timezone.now() - timedelta(days=1)
+        since = TaskChange.objects.latest("id").id
+
+        with (
+            CaptureQueriesContext(connection) as context,
+            self.captureOnCommitCallbacks(execute=True) as callbacks,
+        ):
+            ids = archive_tasks(archivable_tasks(["COMPLETED", "CANCELED"], before))
+
+        self.assertEqual(len(ids), 3)
+        change_inserts = [
+            q for q in context.captured_queries if "task_taskchange" in q["sql"]
+        ]
+        self.assertEqual(len(change_inserts), 1)
+        # Cache invalidation and the broker announcement, once each.
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual(
+            sorted(
+                TaskChange.objects.filter(id__gt=since).values_list(
+                    "task_id", flat=True
+                )
+            ),
+            sorted(ids),
+        )
+
+    def test_change_feed_agrees_with_detail_on_archived_tasks(self) -> None:
+        since = TaskChange.objects.latest("id").id
+        self.archive()
+
+        data = self.client.get(reverse("tasks-changes"), {"since": since}).json()
+        self.assertEqual(
+            [(c["id"], c["deleted"], c["archived"]) for c in data["results"]],
+            [
+                (self.old_completed.id, False, True),
+                (self.old_canceled.id, False, True),
+                (self.tasks[3].id, False, True),
+            ],
+        )
+        for change in data["results"]:
+            detail = self.client.get(
+                reverse("tasks-get-by-id", kwargs={"id": change["id"]})
+            )
+            self.assertEqual(detail.status_code, 200)
+            self.assertEqual(change["task"], detail.json())
+
+        with override_settings(FAST_READ_SERIALIZATION=False):
+            slow = self.client.get(reverse("tasks-changes"), {"since": since}).json()
+        self.assertEqual(slow, data)
+
+    def test_import_rejects_archived_ids(self) -> None:
+        self.archive()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = Path(tmp.name) / "tasks.ndjson"
+        path.write_text(
+            json.dumps(
+                {
+                    "id": self.old_completed.id,
+                    "title": "T",
+                    "description": "D",
+                    "user_id": self.test_user1.id,
+                }
+            )
+            + "\n"
+        )
+
+        call_command("import_tasks", str(path), stdout=StringIO())
+
+        rejects = Path(f"{path}.rejects.ndjson")
+        self.assertEqual(
+            json.loads(rejects.read_text())["errors"], {"id": ["Task already exists."]}
+        )
+
+    @override_settings(ROOT_URLCONF="config.urls_asgi")
+    async def test_async_views_read_archive(self) -> None:
+        await sync_to_async(self.archive)()
+        auth = f"Bearer {AccessToken.for_user(self.test_user1)}"
+
+        response = await self.async_client.get(
+            reverse("tasks-get-by-id", kwargs={"id": self.old_completed.id}),
+            AUTHORIZATION=auth,
+        )
+        self.assertEqual(response.json()["status"], "COMPLETED")
+
+        response = await self.async_client.get(
+            reverse("tasks"), {"include_archived": "true"}, AUTHORIZATION=auth
+        )
+        self.assertEqual(
+            [task["id"] for task in response.json()["results"]],
+            [task.id for task in self.tasks],
+        )
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            **settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"],
+            "tasks_search": "2/min",
+            "tasks_write": "2/min",
+        },
+    }
+)
+class TestTaskThrottling(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.test_user1 = User.objects.get(email="user1@email.com")
+        self.test_user2 = User.objects.create(
+            username="user2@email.com", email="user2@email.com"
+        )
+        self.client.force_authenticate(user=self.test_user1)
+
+    def test_search_is_throttled_per_user(self) -> None:
+        url = reverse("tasks-search")
+        statuses = [self.client.get(url, {"query": "a"}).status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+        response = self.client.get(url, {"query": "a"})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+
+        self.client.force_authenticate(user=self.test_user2)
+        self.assertEqual(self.client.get(url, {"query": "a"}).status_code, 200)
+
+    def test_only_task_creation_is_throttled(self) -> None:
+        data = {"title": "Task", "description": "Task"}
+        statuses = [
+            self.client.post(reverse("tasks"), data).status_code for _ in range(3)
+        ]
+
+        self.assertEqual(statuses, [201, 201, 429])
+        self.assertEqual(self.client.get(reverse("tasks")).status_code, 200)
+
+    @override_settings(ROOT_URLCONF="config.urls_asgi")
+    async def test_async_search_is_throttled(self) -> None:
+        auth = f"Bearer {AccessToken.for_user(self.test_user1)}"
+        statuses = []
+        for _ in range(3):
+            response = await self.async_client.get(
+                reverse("tasks-search"), {"query": "a"}, AUTHORIZATION=auth
+            )
+            statuses.append(response.status_code)
+
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(response["Retry-After"], "30")
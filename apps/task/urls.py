@@ -2,26 +2,46 @@ from django.urls import path
 
 from apps.task.views import (
     AssignTaskView,
+    BulkAssignTaskView,
+    BulkCompleteTaskView,
+    BulkCreateTaskView,
     CompleteTaskView,
-    DeleteTaskView,
     PostCommentTaskView,
     GetAllTaskCommentsView,
     TaskSearchView,
+    TaskChangesView,
+    TaskStatsView,
+    TaskExportView,
+    TaskCommentsExportView,
     GetTaskView,
     TaskListCreateView,
 )
 
 urlpatterns = [
     path("tasks", TaskListCreateView.as_view(), name="tasks"),
+    path("tasks/bulk", BulkCreateTaskView.as_view(), name="tasks-bulk"),
+    path(
+        "tasks/bulk-complete",
+        BulkCompleteTaskView.as_view(),
+        name="tasks-bulk-complete",
+    ),
+    path("tasks/bulk-assign", BulkAssignTaskView.as_view(), name="tasks-bulk-assign"),
+    path("tasks/stats", TaskStatsView.as_view(), name="tasks-stats"),
+    path("tasks/changes", TaskChangesView.as_view(), name="tasks-changes"),
+    path("tasks/export", TaskExportView.as_view(), name="tasks-export"),
     path("tasks/<int:id>", GetTaskView.as_view(), name="tasks-get-by-id"),
     path("tasks/<int:id>/assign", AssignTaskView.as_view(), name="tasks-assign"),
     path("tasks/<int:id>/complete", CompleteTaskView.as_view(), name="tasks-complete"),
-    path("tasks/<int:id>", DeleteTaskView.as_view(), name="delete-task"),
     path("tasks/<int:id>/comment", PostCommentTaskView.as_view(), name="tasks-comment"),
     path(
         "tasks/<int:id>/comments",
         GetAllTaskCommentsView.as_view(),
         name="tasks-comments",
     ),
+    path(
+        "tasks/<int:id>/comments/export",
+        TaskCommentsExportView.as_view(),
+        name="tasks-comments-export",
+    ),
     path("tasks/search", TaskSearchView.as_view(), name="tasks-search"),
 ]
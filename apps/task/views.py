@@ -1,25 +1,222 @@
+from collections import defaultdict
+from collections.abc import Callable, Collection
+
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter, extend_schema_view
 from rest_framework.generics import (
+    GenericAPIView,
     ListAPIView,
-    RetrieveAPIView,
-    DestroyAPIView,
+    RetrieveDestroyAPIView,
     CreateAPIView,
     ListCreateAPIView,
 )
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.generics import get_object_or_404
+from apps.common.conditional import make_etag, not_modified, with_validators
+from apps.common.fast_serialization import ValuesSerializer
 from apps.common.helpers import EmptySerializer
-from apps.task.models import Task, Comment
+from apps.common.pagination import RankedPagination
+from apps.common.renderers import FastJSONRenderer
+from apps.notifications.outbox import (
+    enqueue_notification,
+    enqueue_notifications,
+    enqueue_personal_notifications,
+)
+from apps.task.cache import (
+    get_or_load,
+    get_task_version,
+    invalidate_tasks,
+    request_cache_key,
+)
+from apps.task.changes import changes_since, record_changes
+from apps.task.export import (
+    COMMENT_EXPORT_FIELDS,
+    TASK_EXPORT_FIELDS,
+    CSVRenderer,
+    NDJSONRenderer,
+    astream_export,
+    stream_export,
+)
+from apps.task.models import ArchivedTask, Task, Comment
+from apps.task.search import get_search_backend
+from apps.task.stats import get_task_stats
 from apps.task.serializers import (
     TaskSerializer,
     AssignTaskSerializer,
+    BulkAssignTaskSerializer,
+    BulkResultSerializer,
+    BulkTaskIdsSerializer,
     CommentSerializer,
+    TaskChangesQuerySerializer,
+    TaskChangesSerializer,
+    TaskStatsSerializer,
 )
 
 
+TASK_VALUES = ValuesSerializer(TaskSerializer)
+COMMENT_VALUES = ValuesSerializer(CommentSerializer)
+FAST_RENDERER_CLASSES = (FastJSONRenderer, BrowsableAPIRenderer)
+
+
+def row_value(row, name: str):
+    # Fast read paths page over .values() dicts, the others over instances.
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def versioned_response(
+    request, task_id: int, name: str, load: Callable[[], dict]
+) -> HttpResponse:
+    """
+    Serve a cached per-task response with ETag and Last-Modified validators.
+
+    ``load`` returns ``{"data": ..., "updated_at": ...}`` on a cache miss. The ETag
+    comes from the task's cache version, so ``If-None-Match`` requests are
+    answered without touching the database or the cached body. Collections load
+    ``updated_at=None``: deleting one of their rows does not move any row's
+    timestamp, so only the version-based ETag can tell they changed.
+    """
+    url = request.build_absolute_uri()
+    version = get_task_version(task_id)
+    etag = make_etag(name, version, url)
+    if request.headers.get("If-None-Match"):
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+    entry = get_or_load(request_cache_key(task_id, name, url, version), load)
+    return not_modified(request, etag, entry["updated_at"]) or with_validators(
+        Response(entry["data"]), etag, entry["updated_at"]
+    )
+
+
+def filter_tasks(queryset: QuerySet, params) -> QuerySet:
+    status = params.get("status")
+    user_id = params.get("user_id")
+
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    if user_id is not None:
+        queryset = queryset.filter(user__id=user_id)
+
+    return queryset
+
+
+def include_archived(params) -> bool:
+    return params.get("include_archived", "").lower() in ("1", "true")
+
+
+def export_response(
+    request, queryset: QuerySet, fields: tuple[str, ...], filename: str
+) -> StreamingHttpResponse:
+    renderer = request.accepted_renderer
+    stream = (
+        astream_export if isinstance(request._request, ASGIRequest) else stream_export
+    )
+    response = StreamingHttpResponse(
+        stream(queryset, fields, renderer.format),
+        content_type=f"{renderer.media_type}; charset={renderer.charset}",
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{renderer.format}"'
+    )
+    return response
+
+
+def complete_task(task: Task) -> None:
+    with transaction.atomic():
+        task.status = Task.Status.COMPLETED.value
+        task.save(update_fields=["status", "updated_at"])
+
+        commenters = (
+            User.objects.filter(comments__task_id=task.id)
+            .exclude(email="")
+            .values_list("email", flat=True)
+            .distinct()
+        )
+        enqueue_notifications(
+            subject="Task that you commented on is completed",
+            message="The task you commented on has been marked as completed.",
+            recipients=commenters,
+        )
+
+
+def task_changes(
+    since: int,
+    page_size: int,
+    task_ids: Collection[int] = (),
+    user_id: int | None = None,
+) -> dict:
+    """
+    Page of the task change feed after ``since``.
+
+    Given ``task_ids`` or ``user_id``, only those tasks and the tasks of that
+    user are included, but ``since`` still moves past the changes of the others.
+    Archived tasks are reported with their archived data, as the detail view
+    still serves them. Tombstones of deleted tasks are only known for
+    ``task_ids``, as a deleted task has no user.
+    """
+    latest, has_more = changes_since(since, page_size)
+
+    subscribed = bool(task_ids) or user_id is not None
+    condition = Q(id__in=task_ids)
+    if user_id is not None:
+        condition |= Q(user_id=user_id)
+
+    def load(model, ids: Collection[int]) -> dict:
+        queryset = model.objects.filter(id__in=ids)
+        if subscribed:
+            queryset = queryset.filter(condition)
+        if settings.FAST_READ_SERIALIZATION:
+            tasks = TASK_VALUES.to_representation(queryset.values(*TASK_VALUES.columns))
+        else:
+            tasks = TaskSerializer(queryset, many=True).data
+        return {task["id"]: task for task in tasks}
+
+    tasks = load(Task, latest)
+    missing = latest.keys() - tasks.keys()
+    archived = load(ArchivedTask, missing) if missing else {}
+
+    return {
+        "results": [
+            {
+                "seq": seq,
+                "id": task_id,
+                "deleted": task_id not in tasks and task_id not in archived,
+                "archived": task_id in archived,
+                "task": tasks.get(task_id) or archived.get(task_id),
+            }
+            for task_id, seq in latest.items()
+            if task_id in tasks
+            or task_id in archived
+            or not subscribed
+            or task_id in task_ids
+        ],
+        "since": max(latest.values(), default=since),
+        "has_more": has_more,
+    }
+
+
+def bulk_result(requested_ids: list[int], found_ids: set[int]) -> dict:
+    ids = list(dict.fromkeys(requested_ids))
+    return {
+        "ids": [task_id for task_id in ids if task_id in found_ids],
+        "errors": [
+            {"id": task_id, "errors": ["Not found."]}
+            for task_id in ids
+            if task_id not in found_ids
+        ],
+    }
+
+
 @extend_schema_view(
     get=extend_schema(
         parameters=[
@@ -38,6 +235,13 @@ from apps.task.serializers import (
                 type=int,
                 location=OpenApiParameter.QUERY,
             ),
+            OpenApiParameter(
+                name="include_archived",
+                description="Include tasks moved to the archive",
+                required=False,
+                type=bool,
+                location=OpenApiParameter.QUERY,
+            ),
         ],
         responses=TaskSerializer(many=True),
         tags=["tasks"],
@@ -47,50 +251,317 @@ from apps.task.serializers import (
 class TaskListCreateView(ListCreateAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = TaskSerializer
+    renderer_classes = FAST_RENDERER_CLASSES
+    throttle_scope = "tasks_write"
+
+    def get_throttles(self):
+        # Lists are cheap keyset reads, only creation is throttled.
+        return super().get_throttles() if self.request.method == "POST" else []
 
     def get_queryset(self):
-        queryset = Task.objects.all()
-        status = self.request.query_params.get("status")
-        user_id = self.request.query_params.get("user_id")
+        return filter_tasks(Task.objects.all(), self.request.query_params)
 
-        if status is not None:
-            queryset = queryset.filter(status=status)
-        if user_id is not None:
-            queryset = queryset.filter(user__id=user_id)
+    def list(self, request, *args, **kwargs):
+        querysets = [self.filter_queryset(self.get_queryset())]
+        if include_archived(request.query_params):
+            querysets.append(
+                filter_tasks(ArchivedTask.objects.all(), request.query_params)
+            )
+        if settings.FAST_READ_SERIALIZATION:
+            querysets = [
+                queryset.values(*TASK_VALUES.columns, "updated_at")
+                for queryset in querysets
+            ]
+        if len(querysets) == 1:
+            page = self.paginate_queryset(querysets[0])
+        else:
+            page = self.paginator.paginate_querysets(querysets, request, self)
+        versions = [
+            (row_value(task, "id"), row_value(task, "updated_at")) for task in page
+        ]
+        # No Last-Modified: a task deleted from or reassigned out of the page does
+        # not raise the newest updated_at, the ETag covers the ids as well.
+        etag = make_etag(
+            self.paginator.get_next_link(), self.paginator.get_previous_link(), versions
+        )
 
-        return queryset
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        if settings.FAST_READ_SERIALIZATION:
+            data = TASK_VALUES.to_representation(page)
+        else:
+            data = self.get_serializer(page, many=True).data
+        return with_validators(self.get_paginated_response(data), etag)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        task = Task.objects.create(
-            title=serializer.validated_data["title"],
-            description=serializer.validated_data.get("description"),
-            status=Task.Status.OPEN,
-            user=request.user,
-            is_completed=False,
-        )
+        # The change feed entry is written by a post_save signal.
+        with transaction.atomic():
+            task = Task.objects.create(
+                title=serializer.validated_data["title"],
+                description=serializer.validated_data.get("description"),
+                status=Task.Status.OPEN,
+                user=request.user,
+                is_completed=False,
+            )
 
         return Response({"id": task.id}, status=201)
 
 
-class GetTaskView(RetrieveAPIView):
+@extend_schema(
+    request=TaskSerializer(many=True),
+    responses={201: BulkResultSerializer, 400: BulkResultSerializer},
+    tags=["tasks"],
+)
+class BulkCreateTaskView(CreateAPIView):
     permission_classes = (IsAuthenticated,)
-    queryset = Task.objects.all()
+    throttle_scope = "tasks_bulk"
     serializer_class = TaskSerializer
-    lookup_field = "id"
 
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of tasks."]})
+        if len(request.data) > settings.TASK_BULK_MAX_ITEMS:
+            raise ValidationError(
+                {
+                    "non_field_errors": [
+                        f"Ensure there are no more than "
+                        f"{settings.TASK_BULK_MAX_ITEMS} tasks."
+                    ]
+                }
+            )
+
+        tasks = []
+        errors = []
+        for index, item in enumerate(request.data):
+            serializer = self.get_serializer(data=item)
+            if not serializer.is_valid():
+                errors.append({"index": index, "errors": serializer.errors})
+                continue
+            tasks.append(
+                Task(
+                    title=serializer.validated_data["title"],
+                    description=serializer.validated_data.get("description"),
+                    status=Task.Status.OPEN,
+                    user=request.user,
+                    is_completed=False,
+                )
+            )
+
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks, batch_size=settings.TASK_BULK_CHUNK_SIZE)
+            record_changes((task.id for task in tasks), [request.user.id])
+
+        return Response(
+            {"ids": [task.id for task in tasks], "errors": errors},
+            status=201 if tasks else 400,
+        )
+
+
+@extend_schema(responses=BulkResultSerializer, tags=["tasks"])
+class BulkCompleteTaskView(CreateAPIView):
+    permission_classes = (IsAuthenticated,)
+    throttle_scope = "tasks_bulk"
+    serializer_class = BulkTaskIdsSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+
+        with transaction.atomic():
+            owners = dict(Task.objects.filter(id__in=ids).values_list("id", "user_id"))
+            found = set(owners)
+            Task.objects.filter(id__in=found).update(
+                status=Task.Status.COMPLETED.value, updated_at=timezone.now()
+            )
+            invalidate_tasks(found)
+            record_changes(found, owners.values())
+
+            commented = defaultdict(list)
+            commenters = (
+                Comment.objects.filter(task_id__in=found)
+                .exclude(user__email="")
+                .values_list("task_id", "user__email")
+                .distinct()
+                .order_by("task_id")
+            )
+            for task_id, email in commenters:
+                commented[email].append(str(task_id))
+            enqueue_personal_notifications(
+                subject="Tasks that you commented on are completed",
+                messages={
+                    email: "The tasks you commented on have been marked as completed: "
+                    + ", ".join(task_ids)
+                    for email, task_ids in commented.items()
+                },
+            )
+
+        return Response(bulk_result(ids, found))
+
+
+@extend_schema(responses=BulkResultSerializer, tags=["tasks"])
+class BulkAssignTaskView(CreateAPIView):
+    permission_classes = (IsAuthenticated,)
+    throttle_scope = "tasks_bulk"
+    serializer_class = BulkAssignTaskSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+
+        user = get_object_or_404(User, pk=serializer.validated_data["user_id"])
+
+        with transaction.atomic():
+            found = set(Task.objects.filter(id__in=ids).values_list("id", flat=True))
+            Task.objects.filter(id__in=found).update(
+                user=user, updated_at=timezone.now()
+            )
+            invalidate_tasks(found)
+            record_changes(found, [user.id])
+
+            if found and user.email:
+                task_ids = ", ".join(str(task_id) for task_id in sorted(found))
+                enqueue_notification(
+                    subject="New Tasks",
+                    message=f"Tasks with ids {task_ids} are assigned to you",
+                    recipient=user.email,
+                )
 
-class DeleteTaskView(DestroyAPIView):
+        return Response(bulk_result(ids, found))
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            name="format",
+            required=False,
+            type=str,
+            enum=["ndjson", "csv"],
+            location=OpenApiParameter.QUERY,
+        ),
+        OpenApiParameter(
+            name="status",
+            description="Filter by Status",
+            required=False,
+            type=str,
+            enum=[choice[0] for choice in Task.Status.choices],
+            location=OpenApiParameter.QUERY,
+        ),
+        OpenApiParameter(
+            name="user_id",
+            description="Filter by User ID",
+            required=False,
+            type=int,
+            location=OpenApiParameter.QUERY,
+        ),
+    ],
+    responses={(200, "application/x-ndjson"): str, (200, "text/csv"): str},
+    tags=["tasks"],
+)
+class TaskExportView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = EmptySerializer
+    renderer_classes = (NDJSONRenderer, CSVRenderer)
+
+    def get(self, request, *args, **kwargs):
+        queryset = filter_tasks(Task.objects.order_by("id"), request.query_params)
+        return export_response(request, queryset, TASK_EXPORT_FIELDS, "tasks")
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            name="format",
+            required=False,
+            type=str,
+            enum=["ndjson", "csv"],
+            location=OpenApiParameter.QUERY,
+        ),
+    ],
+    responses={(200, "application/x-ndjson"): str, (200, "text/csv"): str},
+    tags=["tasks"],
+)
+class TaskCommentsExportView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = EmptySerializer
+    renderer_classes = (NDJSONRenderer, CSVRenderer)
+
+    def get(self, request, *args, **kwargs):
+        task_id = self.kwargs["id"]
+        if not Task.objects.filter(pk=task_id).exists():
+            raise Http404
+        queryset = Comment.objects.filter(task_id=task_id).order_by("id")
+        return export_response(
+            request, queryset, COMMENT_EXPORT_FIELDS, f"task-{task_id}-comments"
+        )
+
+
+@extend_schema(responses=TaskStatsSerializer, tags=["tasks"])
+class TaskStatsView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = TaskStatsSerializer
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_task_stats())
+
+
+@extend_schema(
+    parameters=[TaskChangesQuerySerializer],
+    responses=TaskChangesSerializer,
+    tags=["tasks"],
+)
+class TaskChangesView(GenericAPIView):
+    """
+    Tasks changed since a sequence number, with tombstones for deleted tasks.
+
+    Clients start from ``since=0`` and pass the returned ``since`` back until
+    ``has_more`` is false.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = TaskChangesSerializer
+    renderer_classes = FAST_RENDERER_CLASSES
+
+    def get(self, request, *args, **kwargs):
+        query = TaskChangesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return Response(
+            task_changes(
+                query.validated_data["since"],
+                query.validated_data.get("page_size", settings.TASK_CHANGES_PAGE_SIZE),
+            )
+        )
+
+
+class GetTaskView(RetrieveDestroyAPIView):
     permission_classes = (IsAuthenticated,)
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     lookup_field = "id"
 
+    def retrieve(self, request, *args, **kwargs):
+        return versioned_response(request, self.kwargs["id"], "detail", self.load)
+
+    def load(self) -> dict:
+        try:
+            task = self.get_object()
+        except Http404:
+            # Archived tasks stay readable, but can no longer be changed.
+            task = get_object_or_404(ArchivedTask, id=self.kwargs["id"])
+        return {
+            "data": dict(self.get_serializer(task).data),
+            "updated_at": task.updated_at,
+        }
+
 
 class AssignTaskView(CreateAPIView):
     permission_classes = (IsAuthenticated,)
+    throttle_scope = "tasks_write"
     serializer_class = AssignTaskSerializer
 
     def create(self, request, *args, **kwargs):
@@ -103,78 +574,87 @@ class AssignTaskView(CreateAPIView):
         task = get_object_or_404(Task, pk=task_id)
         user = get_object_or_404(User, pk=user_id)
 
-        task.user = user
-        task.save(update_fields=["user"])
+        with transaction.atomic():
+            task.user = user
+            task.save(update_fields=["user", "updated_at"])
 
-        send_mail(
-            subject="New Task",
-            message=f"Task with id {task.id} is assigned to you",
-            from_email="ttomson979@gmail.com",
-            recipient_list=[user.email],
-        )
+            if user.email:
+                enqueue_notification(
+                    subject="New Task",
+                    message=f"Task with id {task.id} is assigned to you",
+                    recipient=user.email,
+                )
 
         return Response(status=204)
 
 
 class CompleteTaskView(CreateAPIView):
     permission_classes = (IsAuthenticated,)
+    throttle_scope = "tasks_write"
     serializer_class = EmptySerializer
 
     def create(self, request, *args, **kwargs):
         task_id = self.kwargs.get("id")
         task = get_object_or_404(Task, pk=task_id)
-        task.status = Task.Status.COMPLETED.value
-        task.save(update_fields=["status"])
-
-        commenters = set()
-        for c in task.comments.all():
-            if c.user and c.user.email:
-                commenters.add(c.user.email)
-
-        for email in commenters:
-            send_mail(
-                subject="Task that you commented on is completed",
-                message="The task you commented on has been marked as completed.",
-                from_email="ttomson979@gmail.com",
-                recipient_list=[email],
-            )
-
+        complete_task(task)
         return Response(status=204)
 
 
 class GetAllTaskCommentsView(ListAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = CommentSerializer
+    renderer_classes = FAST_RENDERER_CLASSES
 
     def get_queryset(self):
-        task_id = self.kwargs.get("id")
-        task = get_object_or_404(Task, pk=task_id)
-        return task.comments.all()
+        return Comment.objects.filter(task_id=self.kwargs.get("id")).only("id", "text")
+
+    def list(self, request, *args, **kwargs):
+        return versioned_response(request, self.kwargs["id"], "comments", self.load)
+
+    def load(self) -> dict:
+        queryset = self.filter_queryset(self.get_queryset())
+        if settings.FAST_READ_SERIALIZATION:
+            queryset = queryset.values(*COMMENT_VALUES.columns, "id")
+        page = self.paginate_queryset(queryset)
+        # An empty page is the only case that needs a separate existence check.
+        if not page and not Task.objects.filter(pk=self.kwargs["id"]).exists():
+            raise Http404
+        if settings.FAST_READ_SERIALIZATION:
+            data = COMMENT_VALUES.to_representation(page)
+        else:
+            data = self.get_serializer(page, many=True).data
+        return {
+            "data": dict(self.get_paginated_response(data).data),
+            "updated_at": None,
+        }
 
 
 class PostCommentTaskView(CreateAPIView):
     permission_classes = (IsAuthenticated,)
+    throttle_scope = "comments"
     serializer_class = CommentSerializer
 
     def create(self, request, *args, **kwargs):
         task_id = self.kwargs.get("id")
-        task = get_object_or_404(Task, pk=task_id)
+        task = get_object_or_404(
+            Task.objects.select_related("user").only("id", "user__email"), pk=task_id
+        )
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        comment = Comment.objects.create(
-            text=serializer.validated_data["text"], task=task, user=request.user
-        )
-
-        if task.user and task.user.email:
-            send_mail(
-                subject="New Comment",
-                message=comment.text,
-                from_email="ttomson979@gmail.com",
-                recipient_list=[task.user.email],
+        with transaction.atomic():
+            comment = Comment.objects.create(
+                text=serializer.validated_data["text"], task=task, user=request.user
             )
 
+            if task.user.email:
+                enqueue_notification(
+                    subject="New Comment",
+                    message=comment.text,
+                    recipient=task.user.email,
+                )
+
         return Response({"id": comment.id, "text": comment.text}, status=201)
 
 
@@ -185,7 +665,7 @@ class PostCommentTaskView(CreateAPIView):
             required=False,
             type=str,
             location=OpenApiParameter.QUERY,
-            description="Search by query",
+            description="Ranked prefix search over title and description",
         )
     ],
     responses=TaskSerializer(many=True),
@@ -193,8 +673,18 @@ class PostCommentTaskView(CreateAPIView):
 )
 class TaskSearchView(ListAPIView):
     permission_classes = (IsAuthenticated,)
+    throttle_scope = "tasks_search"
     serializer_class = TaskSerializer
+    pagination_class = RankedPagination
+    renderer_classes = FAST_RENDERER_CLASSES
 
     def get_queryset(self):
         search_term = self.request.query_params.get("query", "")
-        return Task.objects.filter(title__icontains=search_term)
+        return get_search_backend().search(Task.objects.all(), search_term)
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_READ_SERIALIZATION:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset.values(*TASK_VALUES.columns))
+        return self.get_paginated_response(TASK_VALUES.to_representation(page))
@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.http import HttpRequest
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.users.cache import aget_auth_user, get_auth_user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication resolving the user from the cache instead of the database.
+
+    Safe requests are authenticated from the token claims alone when
+    ``JWT_TRUST_CLAIMS_FOR_SAFE_METHODS`` is set.
+    """
+
+    def authenticate(self, request: HttpRequest) -> tuple | None:
+        validated_token = self.get_request_token(request)
+        if validated_token is None:
+            return None
+
+        if self.trusts_claims(request):
+            return TokenUser(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_request_token(self, request: HttpRequest) -> Token | None:
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        return self.get_validated_token(raw_token)
+
+    @staticmethod
+    def trusts_claims(request: HttpRequest) -> bool:
+        return (
+            settings.JWT_TRUST_CLAIMS_FOR_SAFE_METHODS
+            and request.method in SAFE_METHODS
+        )
+
+    def get_user(self, validated_token: Token):
+        user_id = self.get_user_id(validated_token)
+        user = get_auth_user(
+            user_id,
+            lambda: self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).first(),
+        )
+        return self.check_user(user, validated_token)
+
+    @staticmethod
+    def get_user_id(validated_token: Token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+    @staticmethod
+    def check_user(user, validated_token: Token):
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+
+        return user
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication for plain async Django views.
+
+    Token validation is CPU only, the user is loaded with the async ORM so the
+    request never blocks a worker thread.
+    """
+
+    async def aauthenticate(self, request: HttpRequest) -> tuple | None:
+        validated_token = self.get_request_token(request)
+        if validated_token is None:
+            return None
+
+        if self.trusts_claims(request):
+            return TokenUser(validated_token), validated_token
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token: Token):
+        user_id = self.get_user_id(validated_token)
+        user = await aget_auth_user(
+            user_id,
+            lambda: self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).afirst(),
+        )
+        return self.check_user(user, validated_token)
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    # Documents the subclasses with the security scheme of JWTAuthentication.
+    target_class = CachedJWTAuthentication
+    match_subclasses = True
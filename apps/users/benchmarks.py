@@ -0,0 +1,62 @@
+from itertools import count
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db.models import F
+from rest_framework.reverse import reverse
+
+from apps.common.benchmark import create_users, get_driver, measure_requests, scenario
+from apps.users.hashers import PBKDF2PasswordHasher
+
+PASSWORD = "bench-password"
+
+
+@scenario("auth")
+def auth(options: dict) -> list[dict]:
+    """
+    Throughput and latency of login and registration under concurrent load as the
+    user table grows, at the configured password hashing cost.
+    """
+    driver = get_driver(options)
+    # Users log in with their email, which is their username.
+    password = make_password(PASSWORD)
+    emails = []
+    logins = count()
+    registrations = count()
+    iterations = PBKDF2PasswordHasher().iterations
+
+    rows = []
+    for size in options["sizes"]:
+        users = create_users(size - len(emails), prefix=f"auth{len(emails)}-")
+        User.objects.filter(id__in=[user.id for user in users]).update(
+            username=F("email"), password=password
+        )
+        emails += [user.email for user in users]
+
+        bodies = {
+            "login": lambda emails=emails: {
+                "email": emails[next(logins) % len(emails)],
+                "password": PASSWORD,
+            },
+            "register": lambda: {
+                "email": f"register{next(registrations)}@bench.local",
+                "password": PASSWORD,
+            },
+        }
+        for endpoint, body in bodies.items():
+            stats = measure_requests(
+                driver,
+                reverse(f"token_{endpoint}"),
+                options["iterations"],
+                options["concurrency"],
+                body,
+            )
+            rows.append(
+                {
+                    "users": size,
+                    "endpoint": endpoint,
+                    "hash_iterations": iterations,
+                    **stats,
+                }
+            )
+    return rows
@@ -0,0 +1,67 @@
+import hashlib
+from collections.abc import Awaitable, Callable
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.common.cache import get_version
+
+USERS_VERSION_KEY = "users:version"
+
+
+def users_cache_key(url: str) -> str:
+    digest = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+    return f"users:{get_version(USERS_VERSION_KEY)}:list:{digest}"
+
+
+def get_or_load_users(url: str, loader):
+    return cache.get_or_set(users_cache_key(url), loader, settings.USERS_CACHE_TIMEOUT)
+
+
+def invalidate_users() -> None:
+    """
+    Orphan every cached user directory page, now and again on commit.
+    """
+    cache.delete(USERS_VERSION_KEY)
+    transaction.on_commit(lambda: cache.delete(USERS_VERSION_KEY))
+
+
+def auth_user_cache_key(user_id) -> str:
+    return f"users:auth:{user_id}"
+
+
+def get_auth_user(user_id, load: Callable[[], User | None]) -> User | None:
+    """
+    User authenticated by a token, cached for ``JWT_USER_CACHE_TIMEOUT``.
+    """
+    key = auth_user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = load()
+        if user is not None:
+            cache.set(key, user, settings.JWT_USER_CACHE_TIMEOUT)
+    return user
+
+
+async def aget_auth_user(
+    user_id, load: Callable[[], Awaitable[User | None]]
+) -> User | None:
+    key = auth_user_cache_key(user_id)
+    user = await cache.aget(key)
+    if user is None:
+        user = await load()
+        if user is not None:
+            await cache.aset(key, user, settings.JWT_USER_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_auth_user(user_id) -> None:
+    """
+    Drop the cached user, now and again on commit, so a concurrent request cannot
+    cache the row as it was before the change.
+    """
+    key = auth_user_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher with the iteration count of
+    ``PASSWORD_HASH_ITERATIONS``.
+
+    Hashes of another count still verify, and are rehashed with the configured
+    count on the user's next successful login.
+    """
+
+    @property
+    def iterations(self) -> int:
+        return settings.PASSWORD_HASH_ITERATIONS or super().iterations
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+SEARCH_FIELDS = ("first_name", "last_name", "email")
+
+
+def index_name(field: str) -> str:
+    return f"users_{field}_prefix_idx"
+
+
+def create_search_indexes(apps, schema_editor) -> None:
+    """
+    Indexes serving the case-insensitive prefix search of the user directory.
+
+    auth_user belongs to django.contrib.auth, so they are created here instead
+    of in model Meta. The expression has to match how each backend compiles
+    ``istartswith``.
+    """
+    vendor = schema_editor.connection.vendor
+    for field in SEARCH_FIELDS:
+        if vendor == "sqlite":
+            expression = f"{field} COLLATE NOCASE"
+        elif vendor == "postgresql":
+            expression = f"UPPER({field}) varchar_pattern_ops"
+        else:
+            return
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name(field)} "
+            f"ON auth_user ({expression})"
+        )
+
+
+def drop_search_indexes(apps, schema_editor) -> None:
+    if schema_editor.connection.vendor not in ("sqlite", "postgresql"):
+        return
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index_name(field)}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
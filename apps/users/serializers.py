@@ -13,6 +13,8 @@ class RegisterUserSerializer(serializers.ModelSerializer):
             "email",
             "password",
         )
+        # The email is the username as well.
+        extra_kwargs = {"email": {"required": True, "allow_blank": False}}
 
 
 class LoginUserSerializer(serializers.ModelSerializer):
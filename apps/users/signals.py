@@ -0,0 +1,39 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.users.cache import invalidate_auth_user, invalidate_users
+
+# Columns the user directory returns or searches.
+DIRECTORY_FIELDS = frozenset({"first_name", "last_name", "email"})
+# Columns the cached authenticated user does not need to be fresh on.
+AUTH_IGNORED_FIELDS = frozenset({"last_login"})
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_cache_on_save(
+    sender, instance: User, created: bool, update_fields=None, **kwargs
+) -> None:
+    # A save without update_fields may have changed anything.
+    if created or update_fields is None or DIRECTORY_FIELDS & update_fields:
+        invalidate_users()
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance: User, **kwargs) -> None:
+    invalidate_users()
+
+
+@receiver(post_save, sender=User)
+def invalidate_auth_user_cache_on_save(
+    sender, instance: User, created: bool, update_fields=None, **kwargs
+) -> None:
+    # Deactivation and password changes must reach authentication at once. A new
+    # user has nothing cached, and update_last_login() saves only last_login.
+    if not created and (update_fields is None or update_fields - AUTH_IGNORED_FIELDS):
+        invalidate_auth_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_auth_user_cache(sender, instance: User, **kwargs) -> None:
+    invalidate_auth_user(instance.pk)
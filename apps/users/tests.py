@@ -1,13 +1,23 @@
-from django.contrib.auth.models import User
-from django.test import TestCase
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User, update_last_login
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.users.hashers import PBKDF2PasswordHasher
+from apps.users.serializers import UserListSerializer
 
 
 class TestUsers(TestCase):
     fixtures = ["users"]
 
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
         # check data in fixture json file
         self.test_user1 = User.objects.get(email="user1@email.com")
@@ -18,8 +28,251 @@ class TestUsers(TestCase):
             {
                 "first_name": "firstname2",
                 "last_name": "lastname2",
-                "username": "username2",
+                "email": "user2@email.com",
                 "password": "testpwd2",
             },
         )
         self.assertEqual(response.status_code, 200)
+
+        user = User.objects.get(email="user2@email.com")
+        self.assertEqual(user.username, "user2@email.com")
+        self.assertTrue(user.check_password("testpwd2"))
+        access = AccessToken(response.data["access"])
+        self.assertEqual(access["user_id"], str(user.id))
+        self.assertIn("refresh", response.data)
+
+    def test_authentication_endpoints_are_throttled_per_address(self) -> None:
+        rates = {**settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "auth": "2/min"}
+        with self.settings(
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+        ):
+            statuses = [
+                self.client.post(reverse("token_register"), {}).status_code
+                for _ in range(3)
+            ]
+            other = self.client.post(
+                reverse("token_register"), {}, REMOTE_ADDR="10.0.0.2"
+            )
+
+        self.assertEqual(statuses, [400, 400, 429])
+        self.assertEqual(other.status_code, 400)
+
+    def test_get_all_users_is_paginated(self) -> None:
+        User.objects.bulk_create(
+            User(username=f"user{i}", email=f"user{i}@email.com") for i in range(2, 80)
+        )
+        self.client.force_authenticate(user=self.test_user1)
+
+        response = self.client.get(reverse("get_all_users"))
+        next_page = self.client.get(response.data["next"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 50)
+        self.assertEqual(len(next_page.data["results"]), 29)
+        self.assertIsNone(next_page.data["next"])
+
+    def test_get_all_users_matches_serializer(self) -> None:
+        self.client.force_authenticate(user=self.test_user1)
+
+        response = self.client.get(reverse("get_all_users"))
+
+        self.assertEqual(
+            response.data["results"],
+            UserListSerializer(User.objects.order_by("id"), many=True).data,
+        )
+
+    def test_get_all_users_prefix_search(self) -> None:
+        User.objects.create(username="a", first_name="Johanna", last_name="Smith")
+        User.objects.create(username="b", first_name="Ann", last_name="Johnson")
+        User.objects.create(username="c", email="jo@email.com")
+        User.objects.create(username="d", first_name="Mary", last_name="Ajo")
+        self.client.force_authenticate(user=self.test_user1)
+
+        response = self.client.get(reverse("get_all_users"), {"search": "JO"})
+
+        self.assertEqual(
+            [user["full_name"] for user in response.data["results"]],
+            ["Johanna Smith", "Ann Johnson", " "],
+        )
+
+    def test_get_all_users_is_cached_until_a_user_changes(self) -> None:
+        self.client.force_authenticate(user=self.test_user1)
+        self.client.get(reverse("get_all_users"))
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse("get_all_users"))
+
+        self.test_user1.first_name = "Renamed"
+        self.test_user1.save()
+        response = self.client.get(reverse("get_all_users"))
+
+        self.assertEqual(response.data["results"][0]["full_name"][:7], "Renamed")
+
+    def test_get_all_users_cache_survives_last_login_updates(self) -> None:
+        self.client.force_authenticate(user=self.test_user1)
+        self.client.get(reverse("get_all_users"))
+
+        update_last_login(None, self.test_user1)
+        with self.assertNumQueries(0):
+            self.client.get(reverse("get_all_users"))
+
+        self.test_user1.last_name = "Renamed"
+        self.test_user1.save(update_fields=["last_name"])
+        response = self.client.get(reverse("get_all_users"))
+
+        self.assertTrue(response.data["results"][0]["full_name"].endswith("Renamed"))
+
+
+class TestCachedJWTAuthentication(TestCase):
+    fixtures = ["users"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.get(email="user1@email.com")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def get(self):
+        return self.client.get(reverse("protected_view"))
+
+    def test_user_is_loaded_once(self) -> None:
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get().status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().status_code, 200)
+
+    def test_last_login_updates_keep_the_cached_user(self) -> None:
+        self.get()
+
+        update_last_login(None, self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().status_code, 200)
+
+    def test_deactivation_applies_to_the_next_request(self) -> None:
+        self.get()
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_deletion_applies_to_the_next_request(self) -> None:
+        self.get()
+
+        self.user.delete()
+
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_password_change_applies_to_the_next_request(self) -> None:
+        # simplejwt modules keep the settings object they imported, so it is
+        # patched rather than overridden.
+        with patch.object(api_settings, "CHECK_REVOKE_TOKEN", True):
+            self.client.credentials(
+                HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+            )
+            self.assertEqual(self.get().status_code, 200)
+
+            self.user.set_password("changed-password")
+            self.user.save()
+
+            self.assertEqual(self.get().status_code, 401)
+
+    @override_settings(JWT_USER_CACHE_TIMEOUT=60)
+    def test_updates_bypassing_signals_apply_when_the_entry_expires(self) -> None:
+        self.get()
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.get().status_code, 200)
+        cache.clear()
+        self.assertEqual(self.get().status_code, 401)
+
+    @override_settings(JWT_TRUST_CLAIMS_FOR_SAFE_METHODS=True)
+    def test_safe_requests_can_trust_token_claims(self) -> None:
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().status_code, 200)
+        response = self.client.post(reverse("tasks"), {"title": "Task"})
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1_000)
+class TestRegisterAndLogin(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        encode = patch.object(
+            PBKDF2PasswordHasher,
+            "encode",
+            autospec=True,
+            side_effect=PBKDF2PasswordHasher.encode,
+        )
+        self.encode = encode.start()
+        self.addCleanup(encode.stop)
+
+    def register(self, email: str = "new@email.com"):
+        return self.client.post(
+            reverse("token_register"),
+            {"email": email, "password": "secret-pwd", "first_name": "New"},
+        )
+
+    def login(self, password: str = "secret-pwd"):
+        return self.client.post(
+            reverse("token_login"), {"email": "new@email.com", "password": password}
+        )
+
+    def test_register_issues_tokens_hashing_the_password_once(self) -> None:
+        response = self.register()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.encode.call_count, 1)
+        user = User.objects.get(username="new@email.com")
+        self.assertEqual(AccessToken(response.data["access"])["user_id"], str(user.id))
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get(reverse("protected_view")).status_code, 200)
+
+    def test_register_rejects_a_taken_email(self) -> None:
+        self.register()
+
+        # The INSERT and its savepoint queries, no SELECT beforehand.
+        with self.assertNumQueries(4):
+            response = self.register()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data, {"email": "A user with this email already exists."}
+        )
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_register_requires_an_email(self) -> None:
+        response = self.client.post(reverse("token_register"), {"password": "pwd"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("email", response.data)
+
+    def test_login_authenticates_once(self) -> None:
+        self.register()
+        self.encode.reset_mock()
+
+        response = self.login()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {"access", "refresh"})
+        self.assertEqual(self.encode.call_count, 1)
+        self.assertEqual(self.login("wrong").status_code, 401)
+
+    def test_login_rehashes_with_the_configured_cost(self) -> None:
+        self.register()
+
+        with self.settings(PASSWORD_HASH_ITERATIONS=2_000):
+            self.assertEqual(self.login().status_code, 200)
+
+        password = User.objects.get(username="new@email.com").password
+        self.assertTrue(password.startswith("pbkdf2_sha256$2000$"))
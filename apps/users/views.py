@@ -1,10 +1,17 @@
-from django.contrib.auth.models import User
-from rest_framework.exceptions import ValidationError
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User, update_last_login
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.cache import get_or_load_users
 from apps.users.serializers import (
     RegisterUserSerializer,
     LoginUserSerializer,
@@ -12,19 +19,58 @@ from apps.users.serializers import (
 )
 
 
+def issue_tokens(user: User) -> dict:
+    # The response of TokenObtainPairView, for a user authenticated already.
+    refresh = RefreshToken.for_user(user)
+    if api_settings.UPDATE_LAST_LOGIN:
+        update_last_login(None, user)
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            name="search",
+            required=False,
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="Case-insensitive prefix of the first name, last name or email",
+        )
+    ]
+)
 class GetAllUsersView(GenericAPIView):
     serializer_class = UserListSerializer
     permission_classes = (IsAuthenticated,)
 
+    def get_queryset(self):
+        queryset = User.objects.values("id", "first_name", "last_name")
+        search = self.request.query_params.get("search")
+        if search:
+            queryset = queryset.filter(
+                Q(first_name__istartswith=search)
+                | Q(last_name__istartswith=search)
+                | Q(email__istartswith=search)
+            )
+        return queryset
+
     def get(self, request: Request) -> Response:
-        users = User.objects.all()
-        return Response(self.get_serializer(users, many=True).data)
+        return Response(get_or_load_users(request.build_absolute_uri(), self.load))
+
+    def load(self) -> dict:
+        page = self.paginate_queryset(self.get_queryset())
+        # Same output as UserListSerializer, without a model instance per row.
+        results = [
+            {"id": row["id"], "full_name": f"{row['first_name']} {row['last_name']}"}
+            for row in page
+        ]
+        return dict(self.get_paginated_response(results).data)
 
 
 class RegisterUserView(GenericAPIView):
     serializer_class = RegisterUserSerializer
     permission_classes = (AllowAny,)
     authentication_classes = ()
+    throttle_scope = "auth"
 
     def post(self, request: Request) -> Response:
         serializer = self.serializer_class(data=request.data)
@@ -33,38 +79,37 @@ class RegisterUserView(GenericAPIView):
         data = serializer.validated_data.copy()
         data["username"] = data["email"]
 
-        if User.objects.filter(username=data["username"]).exists():
-            raise ValidationError({"email": "A user with this email already exists."})
-
-        user = User.objects.create_user(**data)
-
-        token_serializer = TokenObtainPairSerializer(
-            data={
-                "email": user.email,
-                "username": user.email,
-                "password": request.data["password"],
-            }
-        )
-        token_serializer.is_valid(raise_exception=True)
+        # The unique username rejects taken emails, without a query beforehand.
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(**data)
+        except IntegrityError as e:
+            raise ValidationError(
+                {"email": "A user with this email already exists."}
+            ) from e
 
-        return Response(token_serializer.validated_data)
+        # The password was just hashed, authenticating would hash it again.
+        return Response(issue_tokens(user))
 
 
 class LoginUserView(GenericAPIView):
     serializer_class = LoginUserSerializer
     permission_classes = (AllowAny,)
+    throttle_scope = "auth"
 
     def post(self, request: Request) -> Response:
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        token_serializer = TokenObtainPairSerializer(
-            data={
-                "email": serializer.data["email"],
-                "username": serializer.data["email"],
-                "password": request.data["password"],
-            }
+        user = authenticate(
+            request,
+            username=serializer.validated_data["email"],
+            password=serializer.validated_data["password"],
         )
-        token_serializer.is_valid(raise_exception=True)
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                TokenObtainSerializer.default_error_messages["no_active_account"],
+                "no_active_account",
+            )
 
-        return Response(token_serializer.validated_data)
+        return Response(issue_tokens(user))
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("DJANGO_ROOT_URLCONF", "config.urls_asgi")
+# Sync ORM calls run in sync_to_async worker threads, each holding its own
+# connection, which a non-zero CONN_MAX_AGE would keep open after the request.
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
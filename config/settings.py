@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -25,9 +26,11 @@ INSTALLED_APPS = [
     "apps.common",
     "apps.users",
     "apps.task",
+    "apps.notifications",
 ]
 
 MIDDLEWARE = [
+    "apps.common.middlewares.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -38,7 +41,12 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
 ]
 
-ROOT_URLCONF = "config.urls"
+# Queries taking at least this many milliseconds are logged as warnings to the
+# apps.common.slow_queries logger.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 500))
+
+# The ASGI entry point switches to config.urls_asgi, which serves async task views.
+ROOT_URLCONF = os.environ.get("DJANGO_ROOT_URLCONF", "config.urls")
 
 TEMPLATES = [
     {
@@ -57,13 +65,84 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
-DATABASES = {
+# SQLite by default. Set DB_ENGINE (e.g. django.db.backends.postgresql) and
+# DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT for a database server, and
+# DB_POOL=1 to use psycopg's connection pool (requires psycopg[pool]).
+DB_ENGINE = os.environ.get("DB_ENGINE", "django.db.backends.sqlite3")
+DB_POOL = os.environ.get("DB_POOL", "0") == "1"
+# Persistent connections suit the WSGI server's fixed worker threads. The ASGI
+# entry point defaults this to 0, since connections opened in its executor
+# threads are not closed at the end of a request; set DB_CONN_MAX_AGE to
+# override, or use DB_POOL.
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", 60))
+
+if DB_ENGINE == "django.db.backends.sqlite3":
+    DATABASES = {
+        "default": {
+            "ENGINE": DB_ENGINE,
+            "NAME": os.environ.get("DB_NAME", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                # Seconds a writer waits for the lock instead of failing with
+                # "database is locked".
+                "timeout": int(os.environ.get("DB_BUSY_TIMEOUT", 20)),
+                # Take the write lock when the transaction starts. A deferred
+                # transaction that reads and then writes cannot wait for the lock
+                # and fails immediately when another writer holds it.
+                "transaction_mode": "IMMEDIATE",
+                # WAL lets readers run concurrently with the single writer.
+                "init_command": "PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL;",
+            },
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": DB_ENGINE,
+            "NAME": os.environ.get("DB_NAME", "tms"),
+            "USER": os.environ.get("DB_USER", ""),
+            "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+            "HOST": os.environ.get("DB_HOST", "localhost"),
+            "PORT": os.environ.get("DB_PORT", ""),
+            # Django does not allow persistent connections together with a pool.
+            "CONN_MAX_AGE": 0 if DB_POOL else DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": (
+                {
+                    "pool": {
+                        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+                        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 20)),
+                    }
+                }
+                if DB_POOL
+                else {}
+            ),
+        }
+    }
+
+# Local memory by default. Point CACHE_BACKEND/CACHE_LOCATION at a shared cache
+# (e.g. django.core.cache.backends.redis.RedisCache and redis://host:6379) when
+# running more than one process, so cache invalidation reaches every worker.
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "tms"),
     }
 }
 
+# Seconds task detail and comment list responses stay cached.
+TASK_CACHE_TIMEOUT = 300
+
+# Seconds user directory pages stay cached. User changes invalidate them early.
+USERS_CACHE_TIMEOUT = 300
+
+# Seconds the /tasks/stats aggregates are reused before being recomputed, 0
+# computes them on every request.
+TASK_STATS_CACHE_TIMEOUT = 30
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -79,13 +158,94 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hashers of stored passwords, the first one hashes new passwords. The others
+# only verify hashes created with them, which are upgraded on the next login.
+PASSWORD_HASHERS = [
+    "apps.users.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+# PBKDF2 iterations of password hashes, 0 keeps Django's default. Every login and
+# registration pays for one hash, so this bounds their throughput. Existing
+# hashes are updated to a new count on the next login.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("PASSWORD_HASH_ITERATIONS", 0))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.users.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "apps.common.pagination.IdCursorPagination",
+    "PAGE_SIZE": 50,
+    "DEFAULT_THROTTLE_CLASSES": [
+        "apps.common.throttling.TokenBucketThrottle",
+    ],
+    # Token buckets per user, or client address, for views with a throttle_scope.
+    # A scope rated None is not throttled.
+    "DEFAULT_THROTTLE_RATES": {
+        "auth": "10/min",
+        "comments": "30/min",
+        "tasks_bulk": "10/min",
+        "tasks_search": "60/min",
+        "tasks_write": "120/min",
+    },
 }
 
+# Seconds JWT authentication reuses a cached user instead of loading it. Saving or
+# deleting a user evicts it at once. Changes made with QuerySet.update() bypass
+# the eviction and apply once the entry expires.
+JWT_USER_CACHE_TIMEOUT = 60
+
+# Authenticate GET, HEAD and OPTIONS requests from the token claims alone, without
+# loading the user. Deactivation and password changes are then only enforced on
+# those requests once the access token expires.
+JWT_TRUST_CLAIMS_FOR_SAFE_METHODS = False
+
+# Serve task lists, search results and comment lists from .values() rows instead
+# of model serializers. The output is the same either way.
+FAST_READ_SERIALIZATION = True
+
+# Upper bound of items accepted by one bulk task request and the number of rows
+# written per INSERT.
+TASK_BULK_MAX_ITEMS = 10_000
+TASK_BULK_CHUNK_SIZE = 1_000
+
+# Rows fetched per database round trip and encoded per chunk by the exports.
+TASK_EXPORT_CHUNK_SIZE = 2_000
+
+# Upper bound, and default, of the changes read by one /tasks/changes request.
+TASK_CHANGES_PAGE_SIZE = 500
+
+# `manage.py archive_tasks` moves tasks in these statuses, not updated for
+# TASK_ARCHIVE_AFTER_DAYS days, and their comments to the archive tables. Task
+# details stay readable and lists include them with ?include_archived=true.
+TASK_ARCHIVE_STATUSES = ("COMPLETED", "CANCELED", "ARCHIVED")
+TASK_ARCHIVE_AFTER_DAYS = 90
+
+# Broker telling open task event streams about changes. LocalBroker only reaches
+# the streams of its own process. apps.common.events.RedisBroker (requires the
+# redis package) reaches every process through EVENTS_REDIS_URL.
+EVENTS_BROKER = os.environ.get("EVENTS_BROKER", "apps.common.events.LocalBroker")
+EVENTS_REDIS_URL = os.environ.get("EVENTS_REDIS_URL", "redis://localhost:6379/0")
+
+# Seconds between the keep-alive comments of an idle event stream, which also
+# re-reads the change feed in case a broker message was lost.
+TASK_EVENTS_HEARTBEAT = 15
+
+# Upper bound, and default, of the seconds a long-poll request waits for changes.
+TASK_EVENTS_LONG_POLL_TIMEOUT = 25
+
+# Full-text search implementation used by the task search endpoint. The FTS5
+# index only exists on SQLite.
+TASK_SEARCH_BACKEND = (
+    "apps.task.search.SqliteFTSSearchBackend"
+    if DB_ENGINE == "django.db.backends.sqlite3"
+    else "apps.task.search.SimpleSearchBackend"
+)
+
 LANGUAGE_CODE = "en-us"
 
 TIME_ZONE = "UTC"
@@ -107,6 +267,18 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = "ttomson979@gmail.com"
 EMAIL_HOST_PASSWORD = "jsfejipbuyyaipnx"
+DEFAULT_FROM_EMAIL = "ttomson979@gmail.com"
+
+# Outgoing emails are queued in the notification outbox and delivered by
+# `manage.py send_notifications`.
+NOTIFICATIONS_BATCH_SIZE = 100
+NOTIFICATIONS_MAX_ATTEMPTS = 5
+# Rows per INSERT when one event notifies many recipients.
+NOTIFICATIONS_FANOUT_CHUNK_SIZE = 500
+# Seconds before the first retry, doubled on every following attempt.
+NOTIFICATIONS_RETRY_BACKOFF = 30
+# Seconds a worker holds a claimed batch before other workers may retry it.
+NOTIFICATIONS_LEASE = 300
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
@@ -0,0 +1,15 @@
+"""
+URL configuration of the ASGI deployment.
+
+The hot task endpoints resolve to their async views first, everything else falls
+through to the regular URL configuration.
+"""
+
+from django.urls import include, path
+
+from config.urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("", include("apps.task.async_urls")),
+    *sync_urlpatterns,
+]